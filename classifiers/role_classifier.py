@@ -1,22 +1,119 @@
-import joblib
+import math
+import os
+import warnings
+from collections import OrderedDict
+
 import numpy as np
-import pandas as pd
+
+from features._kernels import extract_and_score, extract_features
+
+# The model was fitted on a DataFrame; predicting on plain arrays is fine
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+MODEL_PATH = "classifiers/trained_model/child_adult_model.pkl"
+ARRAYS_PATH = "classifiers/trained_model/child_adult_model.npz"  # scripts/dump_model.py
+
+ROLES = ("CHILD", "ADULT")
 
 class RoleClassifier:
+    CACHE_SIZE = 4096  # Max memoized feature bins
+
     def __init__(self):
-        self.model = joblib.load(
-            "classifiers/trained_model/child_adult_model.pkl"
-        )
+        # (quantized features) -> (role, prob), least recently used first
+        self._cache = OrderedDict()
+
+        # Plain coefficient arrays load without importing joblib/sklearn
+        if os.path.exists(ARRAYS_PATH):
+            arrays = np.load(ARRAYS_PATH)
+            self.model = None
+            self.weights = arrays["coef"].astype(np.float64)
+            self.bias = float(arrays["intercept"])
+            # Label 1 is ADULT (see scripts/train_classifier.py)
+            self.adult_col = list(arrays["classes"]).index(1)
+            return
+
+        import joblib
+        self.model = joblib.load(MODEL_PATH)
+
+        # Label 1 is ADULT (see scripts/train_classifier.py)
+        self.adult_col = list(self.model.classes_).index(1)
+
+        # A 2-feature logistic regression is one dot product and a sigmoid;
+        # evaluate it directly instead of through sklearn's per-call checks.
+        # Other model types keep going through predict_proba.
+        coef = getattr(self.model, "coef_", None)
+        if coef is not None and coef.shape == (1, 2):
+            self.weights = coef[0].astype(np.float64)
+            self.bias = float(self.model.intercept_[0])
+        else:
+            self.weights = None
+
+    def adult_probability(self, X):
+        """X: (N, 2) rows of [body_height, shoulder_body_ratio] -> (N,) P(ADULT)."""
+        X = np.asarray(X, dtype=np.float64).reshape(-1, 2)
+        if self.weights is None:
+            return self.model.predict_proba(X)[:, self.adult_col]
+
+        # sigmoid gives P(classes_[1])
+        p = 1.0 / (1.0 + np.exp(-(X @ self.weights + self.bias)))
+        return p if self.adult_col == 1 else 1.0 - p
+
+    def classify_batch(self, X):
+        """
+        Classify many persons at once.
+        X: (N, 2) rows of [body_height, shoulder_body_ratio]
+        Returns (is_adult bool (N,), prob of the chosen role float (N,))
+        """
+        p_adult = self.adult_probability(X)
+        is_adult = p_adult > 0.5  # ties go to CHILD, like predict()'s argmax
+        return is_adult, np.where(is_adult, p_adult, 1.0 - p_adult)
+
+    def classify_keypoints(self, kps):
+        """
+        Extract features and classify every person of a frame in one call.
+        kps: (N, 17, 2) float32 keypoints
+        Returns (features (N, 2) float32, is_adult bool (N,), prob of the chosen role (N,))
+        """
+        # No-op for Detections.kps; the compiled kernels take unit stride only
+        kps = np.ascontiguousarray(kps, dtype=np.float32)
+        if self.weights is None:
+            feats = extract_features(kps)
+            is_adult, prob = self.classify_batch(feats)
+            return feats, is_adult, prob
+
+        scored = extract_and_score(kps, self.weights, self.bias)
+        p_adult = scored[:, 2] if self.adult_col == 1 else 1.0 - scored[:, 2]
+        is_adult = p_adult > 0.5  # ties go to CHILD, like predict()'s argmax
+        return scored[:, :2], is_adult, np.where(is_adult, p_adult, 1.0 - p_adult)
+
+    def _classify_scalar(self, body_height, ratio):
+        """One person with plain float math: no array allocation or NumPy dispatch."""
+        w0, w1 = self.weights
+        z = w0 * body_height + w1 * ratio + self.bias
+        p1 = 1.0 / (1.0 + math.exp(-min(max(z, -500.0), 500.0)))  # P(classes_[1])
+        p_adult = p1 if self.adult_col == 1 else 1.0 - p1
+        is_adult = p_adult > 0.5  # ties go to CHILD, like predict()'s argmax
+        return ROLES[is_adult], round(p_adult if is_adult else 1.0 - p_adult, 2)
 
     def classify(self, features):
-        # Use pandas DataFrame with feature names to avoid sklearn warning
-        X = pd.DataFrame([[features["body_height"], features["shoulder_body_ratio"]]], 
-                        columns=["body_height", "shoulder_body_ratio"])
+        body_height = features["body_height"]
+        ratio = features["shoulder_body_ratio"]
 
-        prob = self.model.predict_proba(X)[0]
-        label = self.model.predict(X)[0]
+        # Features of a tracked person barely move between frames, so
+        # predictions are memoized per 4 px height / 0.01 ratio bin
+        key = (round(body_height / 4), round(ratio * 100))
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
 
-        if label == 1:
-            return "ADULT", round(prob[1], 2)
+        if self.weights is not None:
+            result = self._classify_scalar(body_height, ratio)
         else:
-            return "CHILD", round(prob[0], 2)
+            is_adult, prob = self.classify_batch([[body_height, ratio]])
+            result = (ROLES[int(is_adult[0])], round(float(prob[0]), 2))
+
+        self._cache[key] = result
+        if len(self._cache) > self.CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return result
@@ -0,0 +1,155 @@
+import multiprocessing as mp
+import queue
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from detectors.yolo_person_detector import Detections, FramePool, YOLOPersonDetector
+
+MAX_PERSONS = 64  # Result rows per camera; extra detections are dropped
+READY_TIMEOUT = 600  # Seconds a worker may take to load (first run exports an engine)
+
+
+def _detect_worker(stream_id, frame_name, result_name, frame_shape,
+                   jobs, results, detector_kwargs):
+    """Per-camera process: detect on the shared frame, write packed rows back."""
+    frame_shm = shared_memory.SharedMemory(name=frame_name)
+    result_shm = shared_memory.SharedMemory(name=result_name)
+    frame = np.ndarray(frame_shape, dtype=np.uint8, buffer=frame_shm.buf)
+    rows = np.ndarray((MAX_PERSONS, Detections.PACKED_COLS), dtype=np.float32,
+                      buffer=result_shm.buf)
+
+    detector = YOLOPersonDetector(**detector_kwargs)
+    detector.warmup()
+    results.put((stream_id, -1))  # Ready
+
+    while jobs.get() is not None:
+        start = time.perf_counter()
+        try:
+            persons = detector.detect(frame)
+        except Exception as e:
+            print(f"Detection error (camera {stream_id}): {e}")
+            persons = Detections.empty()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        results.put((stream_id, persons.pack(rows), elapsed_ms))
+
+    del frame, rows
+    frame_shm.close()
+    result_shm.close()
+
+
+class ProcessDetectorPool:
+    """
+    One detector process per camera, so several cameras are not serialized
+    on one interpreter's GIL. Frames go in and packed detections come back
+    through shared memory; the queues only carry small notifications.
+
+    Same submit()/next_result() interface as YOLOPersonDetector.start_async().
+    """
+
+    def __init__(self, num_streams, frame_shape, **detector_kwargs):
+        # Spawn: CUDA cannot be re-initialized in a forked child
+        ctx = mp.get_context("spawn")
+        detector_kwargs["batch"] = 1
+        self.results = ctx.Queue()
+        self.busy = [False] * num_streams
+        self.infer_ms = 0.0  # Moving average of the workers' inference time, for scheduling
+        self.frame_pool = FramePool()
+        self.jobs = []
+        self.processes = []
+        self.frame_shms = []
+        self.result_shms = []
+        self.frames = []
+        self.rows = []
+
+        frame_bytes = int(np.prod(frame_shape))
+        row_bytes = MAX_PERSONS * Detections.PACKED_COLS * 4
+        for stream_id in range(num_streams):
+            frame_shm = shared_memory.SharedMemory(create=True, size=frame_bytes)
+            result_shm = shared_memory.SharedMemory(create=True, size=row_bytes)
+            self.frame_shms.append(frame_shm)
+            self.result_shms.append(result_shm)
+            self.frames.append(np.ndarray(frame_shape, dtype=np.uint8, buffer=frame_shm.buf))
+            self.rows.append(np.ndarray((MAX_PERSONS, Detections.PACKED_COLS),
+                                        dtype=np.float32, buffer=result_shm.buf))
+
+            jobs = ctx.Queue(maxsize=1)
+            process = ctx.Process(
+                target=_detect_worker,
+                args=(stream_id, frame_shm.name, result_shm.name, frame_shape,
+                      jobs, self.results, detector_kwargs),
+                daemon=True,
+            )
+            process.start()
+            self.jobs.append(jobs)
+            self.processes.append(process)
+            # Wait until ready so workers don't export the same engine at once
+            try:
+                self._wait_ready(stream_id, process)
+            except RuntimeError:
+                self.close()
+                raise
+
+    def _wait_ready(self, stream_id, process):
+        """Block until the worker reports ready; fail if it dies or hangs."""
+        deadline = time.monotonic() + READY_TIMEOUT
+        while True:
+            try:
+                self.results.get(timeout=1.0)
+                return
+            except queue.Empty:
+                pass
+            if not process.is_alive():
+                raise RuntimeError(
+                    f"Detector process for camera {stream_id} exited during model load "
+                    f"(exit code {process.exitcode})")
+            if time.monotonic() > deadline:
+                raise RuntimeError(
+                    f"Detector process for camera {stream_id} not ready after {READY_TIMEOUT}s")
+
+    def submit(self, frames, stream_ids):
+        """Hand frames to idle workers; a camera whose worker is still busy is skipped."""
+        for frame, stream_id in zip(frames, stream_ids):
+            if self.busy[stream_id]:
+                continue
+            np.copyto(self.frames[stream_id], frame)
+            self.busy[stream_id] = True
+            self.jobs[stream_id].put_nowait(True)
+
+    def next_result(self):
+        """Return finished [(stream_id, frame, Detections), ...] or None."""
+        finished = []
+        while True:
+            try:
+                stream_id, n, elapsed_ms = self.results.get_nowait()
+            except queue.Empty:
+                break
+            # The worker is idle until the next submit(), so both buffers are stable
+            persons = Detections.from_packed(self.rows[stream_id][:n].copy())
+            finished.append((stream_id, self.frame_pool.copy(self.frames[stream_id]), persons))
+            self.busy[stream_id] = False
+            self.infer_ms = elapsed_ms if self.infer_ms == 0 else 0.8 * self.infer_ms + 0.2 * elapsed_ms
+        return finished or None
+
+    def recycle(self, result):
+        """Return a next_result() result's frames to the buffer pool."""
+        self.frame_pool.release(frame for _, frame, _ in result)
+
+    def close(self):
+        for jobs, process in zip(self.jobs, self.processes):
+            if process.is_alive():
+                try:
+                    jobs.put_nowait(None)
+                except queue.Full:
+                    pass  # Still busy with a job; terminated below if it doesn't exit
+        for process in self.processes:
+            process.join(timeout=2)
+            if process.is_alive():
+                process.terminate()
+        # Views must go before the shared memory can be closed
+        self.frames.clear()
+        self.rows.clear()
+        for shm in self.frame_shms + self.result_shms:
+            shm.close()
+            shm.unlink()
@@ -1,46 +1,334 @@
+import os
+import platform
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+import torch
 from ultralytics import YOLO
 
+
+@dataclass
+class Detections:
+    """
+    Persons found in one frame, stored as parallel arrays (structure of arrays).
+    Iterating yields the per-person dicts older callers expect.
+    """
+    ids: np.ndarray   # (N,) int32 track ids
+    bbox: np.ndarray  # (N, 4) int32 x1, y1, x2, y2
+    kps: np.ndarray   # (N, 17, 2) float32 keypoints
+    conf: np.ndarray  # (N,) float32 confidences
+    ctr: np.ndarray   # (N, 2) float32 box centers
+    kp_valid: np.ndarray  # (N,) bool, enough keypoints for the role features
+
+    @classmethod
+    def empty(cls):
+        return cls(
+            ids=np.zeros(0, dtype=np.int32),
+            bbox=np.zeros((0, 4), dtype=np.int32),
+            kps=np.zeros((0, 17, 2), dtype=np.float32),
+            conf=np.zeros(0, dtype=np.float32),
+            ctr=np.zeros((0, 2), dtype=np.float32),
+            kp_valid=np.zeros(0, dtype=bool),
+        )
+
+    # Flat float32 row layout: x1 y1 x2 y2 | cx cy | conf | id | 17 x (kx, ky)
+    PACKED_COLS = 8 + 17 * 2
+
+    @classmethod
+    def from_packed(cls, packed):
+        """
+        Build from (N, PACKED_COLS) float32 rows. Keypoints get their own
+        C-contiguous block (N x 34 floats), the unit-stride layout the
+        compiled feature kernels are specialized for.
+        """
+        n = len(packed)
+        kps = np.ascontiguousarray(packed[:, 8:]).reshape(n, -1, 2)
+        return cls(
+            ids=packed[:, 7].astype(np.int32),
+            bbox=packed[:, :4].astype(np.int32),
+            kps=kps,
+            conf=packed[:, 6].copy(),
+            ctr=packed[:, 4:6].copy(),
+            # Role features read keypoints up to the hips (index 12)
+            kp_valid=np.full(n, kps.shape[1] >= 13),
+        )
+
+    def pack(self, out):
+        """Write up to len(out) persons as packed rows into out; returns the count."""
+        n = min(len(self), len(out))
+        out[:n, :4] = self.bbox[:n]
+        out[:n, 4:6] = self.ctr[:n]
+        out[:n, 6] = self.conf[:n]
+        out[:n, 7] = self.ids[:n]
+        out[:n, 8:] = self.kps[:n].reshape(n, -1)
+        return n
+
+    def centers(self):
+        """(N, 2) float32 box centers."""
+        return self.ctr
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        for i in range(len(self.ids)):
+            yield {
+                "id": int(self.ids[i]),
+                "bbox": tuple(self.bbox[i].tolist()),
+                "keypoints": self.kps[i],
+                "confidence": round(float(self.conf[i]), 2)
+            }
+
+
+def _put_latest(q, item):
+    """Put item on a size-1 queue, replacing whatever is still waiting; returns the replaced item."""
+    try:
+        q.put_nowait(item)
+        return None
+    except queue.Full:
+        try:
+            dropped = q.get_nowait()
+        except queue.Empty:
+            dropped = None
+        q.put_nowait(item)
+        return dropped
+
+
+class FramePool:
+    """
+    Recycled frame buffers for handing frames to another thread/process,
+    so each hand-off is a copy into existing memory, not a new allocation.
+    deque append/pop are atomic, so any thread may acquire or release.
+    """
+
+    def __init__(self):
+        self.free = deque()
+
+    def copy(self, frame):
+        """Return a pooled copy of frame."""
+        try:
+            buf = self.free.pop()
+            if buf.shape != frame.shape:
+                buf = np.empty_like(frame)
+        except IndexError:
+            buf = np.empty_like(frame)
+        np.copyto(buf, frame)
+        return buf
+
+    def release(self, frames):
+        self.free.extend(frames)
+
+
 class YOLOPersonDetector:
     def __init__(self,
                  model_path="yolov8n-pose.pt",
-                 conf_thresh=0.4):
+                 conf_thresh=0.4,
+                 imgsz=None,
+                 use_tensorrt=True,
+                 batch=1,
+                 int8=False,
+                 calib_data=None):
         """
         YOLOv8 Pose detector (person + keypoints)
+
+        imgsz: (height, width) inference size; fixes the TensorRT input shape
+        use_tensorrt: run a cached optimized export: an FP16 TensorRT engine
+                      on CUDA machines, an OpenVINO model on x86 CPUs
+        batch: number of frames per forward pass in detect_batch() (one per camera)
+        int8: build the engine with INT8 calibration instead of FP16
+        calib_data: dataset yaml of camera frames for INT8 calibration
+                    (see scripts/collect_calibration.py)
         """
-        self.model = YOLO(model_path)
         self.conf_thresh = conf_thresh
+        self.imgsz = imgsz
+        self.batch = batch
+        self.int8 = int8 and calib_data is not None
+        self.calib_data = calib_data
+        if int8 and calib_data is None:
+            print("⚠️  INT8 needs calibration data (run scripts/collect_calibration.py); using FP16")
+        self.model = self._load_model(model_path, use_tensorrt)
         self.use_tracking = True
         self.tracking_error_shown = False
         self.next_id = 0  # Fallback ID generator
+        self.trackers = {}  # Per-stream ByteTrack state for detect_batch()
+        self.predictor_mode = None  # "track"/"predict" the live predictor was set up for
+        self.input_bufs = {}  # batch size -> (reused (B, 3, H, W) float32 input tensor, frame size padded for)
+        self.rgb_buf = None
+
+        # Shared ultralytics call arguments
+        self.infer_args = {"conf": self.conf_thresh, "verbose": False}
+        if self.imgsz is not None:
+            self.infer_args["imgsz"] = self.imgsz
+
+    def _load_model(self, model_path, use_tensorrt):
+        """
+        Load a TensorRT FP16/INT8 engine when a CUDA GPU is present, or an
+        OpenVINO model on x86 CPUs, exporting it once if needed.
+        """
+        if not use_tensorrt or not model_path.endswith(".pt"):
+            return YOLO(model_path)
+
+        if not torch.cuda.is_available():
+            return self._load_openvino(model_path)
+
+        # Engines are built for one batch and input size, so both are part of
+        # the file name. FP16 engines are fully static. For INT8, ultralytics
+        # forces dynamic=True; the engine then has an optimisation profile
+        # whose max shape is (batch, 3, H, W). detect_batch() always pads to
+        # exactly `batch` frames of this size, so inputs stay within it.
+        imgsz = self.imgsz or (640, 640)
+        precision = "int8" if self.int8 else "fp16"
+        engine_path = f"{model_path[:-3]}-{imgsz[1]}x{imgsz[0]}-b{self.batch}-{precision}.engine"
+        if not os.path.exists(engine_path):
+            print(f"⚙️  Exporting TensorRT {precision.upper()} engine (one-time): {engine_path}")
+            # INT8 uses TensorRT's entropy (KL-divergence) calibrator over
+            # the calibration images. Ultralytics treats half and int8 as
+            # mutually exclusive, so half is only requested for FP16.
+            calib_args = {"int8": True, "data": self.calib_data} if self.int8 else {}
+            try:
+                exported = YOLO(model_path).export(
+                    format="engine",
+                    half=not self.int8,
+                    imgsz=imgsz,
+                    dynamic=self.int8,  # What ultralytics enforces for INT8 anyway
+                    batch=self.batch,
+                    verbose=False,
+                    **calib_args
+                )
+                os.replace(exported, engine_path)
+            except Exception as e:
+                print(f"⚠️  TensorRT export failed: {e}")
+                print("   Falling back to PyTorch model.")
+                return YOLO(model_path)
+
+        print(f"✅ Using TensorRT engine: {engine_path}")
+        return YOLO(engine_path, task="pose")
+
+    def _load_openvino(self, model_path):
+        """On x86 CPUs, run a cached OpenVINO export (fused, CPU-tuned kernels)."""
+        if platform.machine().lower() not in ("x86_64", "amd64"):
+            return YOLO(model_path)
+
+        imgsz = self.imgsz or (640, 640)
+        export_dir = f"{model_path[:-3]}-{imgsz[1]}x{imgsz[0]}-b{self.batch}_openvino_model"
+        if not os.path.isdir(export_dir):
+            print(f"⚙️  Exporting OpenVINO model (one-time): {export_dir}")
+            try:
+                exported = YOLO(model_path).export(
+                    format="openvino",
+                    imgsz=imgsz,
+                    dynamic=False,
+                    batch=self.batch,
+                    verbose=False
+                )
+                os.replace(exported, export_dir)
+            except Exception as e:
+                print(f"⚠️  OpenVINO export failed: {e}")
+                print("   Falling back to PyTorch model.")
+                return YOLO(model_path)
+
+        print(f"✅ Using OpenVINO model: {export_dir}")
+        return YOLO(export_dir, task="pose")
+
+    def warmup(self, runs=3):
+        """
+        Run a few inferences on a blank frame so engine setup, CUDA kernel
+        selection and memory pools are done before the first real frame.
+        """
+        h, w = self.imgsz or (640, 640)
+        blank = np.zeros((h, w, 3), dtype=np.uint8)
+        for _ in range(runs):
+            self._infer([blank] * self.batch, list(range(self.batch)))
+        self.trackers.clear()
+
+    def start_async(self):
+        """
+        Run inference on a background thread (on its own CUDA stream when a
+        GPU is present) so capture and drawing overlap with the forward pass.
+        Feed it with submit() and poll next_result().
+        """
+        self.frames_in = queue.Queue(maxsize=1)
+        self.results_out = queue.Queue(maxsize=1)
+        self.cuda_stream = torch.cuda.Stream() if torch.cuda.is_available() else None
+        self.infer_ms = 0.0  # Moving average of one forward pass, for scheduling
+        self.frame_pool = FramePool()
+        threading.Thread(target=self._inference_worker, daemon=True).start()
+        return self
+
+    def submit(self, frames, stream_ids):
+        """
+        Queue frames (one per stream) for inference without blocking. Frames
+        are copied (into recycled buffers) because camera buffers get reused;
+        a submission the worker has not picked up yet is replaced.
+        """
+        dropped = _put_latest(
+            self.frames_in, ([self.frame_pool.copy(f) for f in frames], list(stream_ids)))
+        if dropped is not None:
+            self.frame_pool.release(dropped[0])
+
+    def next_result(self):
+        """
+        Return the newest finished [(stream_id, frame, Detections), ...] or None.
+        Hand it back with recycle() once its frames are no longer used.
+        """
+        try:
+            return self.results_out.get_nowait()
+        except queue.Empty:
+            return None
+
+    def recycle(self, result):
+        """Return a next_result() result's frames to the buffer pool."""
+        self.frame_pool.release(frame for _, frame, _ in result)
+
+    def _inference_worker(self):
+        while True:
+            frames, stream_ids = self.frames_in.get()
+            start = time.perf_counter()
+            try:
+                if self.cuda_stream is not None:
+                    with torch.cuda.stream(self.cuda_stream):
+                        detections = self._infer(frames, stream_ids)
+                    self.cuda_stream.synchronize()
+                else:
+                    detections = self._infer(frames, stream_ids)
+            except Exception as e:
+                print(f"Detection error: {e}")
+                self.frame_pool.release(frames)
+                continue
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.infer_ms = elapsed_ms if self.infer_ms == 0 else 0.8 * self.infer_ms + 0.2 * elapsed_ms
+            dropped = _put_latest(self.results_out, list(zip(stream_ids, frames, detections)))
+            if dropped is not None:
+                self.recycle(dropped)
+
+    def _infer(self, frames, stream_ids):
+        if self.batch == 1:
+            return [self.detect(frames[0])]
+        return self.detect_batch(frames, stream_ids)
 
     def detect(self, frame):
         """
-        Returns list of persons:
-        [
+        Returns a Detections object (ids, bbox, kps, conf arrays).
+        Iterating it yields one dict per person:
             {
                 "id": int,
                 "bbox": (x1, y1, x2, y2),
-                "keypoints": [(x, y), ...],
+                "keypoints": (17, 2) float32 array,
                 "confidence": float
             }
-        ]
         """
         # Try tracking first, fall back to detection if tracking fails
         try:
+            source = self._prepare([frame])
             if self.use_tracking:
-                results = self.model.track(
-                    frame,
-                    conf=self.conf_thresh,
-                    persist=True,
-                    tracker="bytetrack.yaml",  # ByteTrack doesn't require lap
-                    verbose=False
-                )
+                results = self._run_model(source, "track")
             else:
-                results = self.model.predict(
-                    frame,
-                    conf=self.conf_thresh,
-                    verbose=False
-                )
+                results = self._run_model(source, "predict")
         except Exception as e:
             # Tracking failed (likely lap issue on Raspberry Pi)
             if not self.tracking_error_shown:
@@ -50,37 +338,157 @@ class YOLOPersonDetector:
             self.use_tracking = False
             
             # Fallback to prediction
-            results = self.model.predict(
-                frame,
-                conf=self.conf_thresh,
-                verbose=False
+            results = self._run_model(self._prepare([frame]), "predict")
+
+        if not results:
+            return Detections.empty()
+        return self._parse_result(results[0])
+
+    def detect_batch(self, frames, stream_ids=None):
+        """
+        Detect persons in several frames (e.g. one per camera) with one
+        forward pass per `batch` frames. Returns one Detections per frame,
+        in input order.
+
+        stream_ids: stable id per frame (camera index) so each stream keeps
+        its own tracker and person ids. An id may repeat for consecutive
+        frames of one video (offline processing); its tracker then sees
+        them in order.
+        """
+        frames = list(frames)
+        if stream_ids is None:
+            stream_ids = list(range(len(frames)))
+
+        detections = []
+        for start in range(0, len(frames), self.batch):
+            chunk = frames[start:start + self.batch]
+            # Static-batch engines need exactly self.batch inputs
+            batch = chunk + [chunk[-1]] * (self.batch - len(chunk))
+
+            results = self._run_model(self._prepare(batch), "predict")[:len(chunk)]
+
+            for stream_id, r in zip(stream_ids[start:start + self.batch], results):
+                if self.use_tracking:
+                    r = self._track(stream_id, r)
+                detections.append(self._parse_result(r))
+        return detections
+
+    def _prepare(self, frames):
+        """
+        Convert same-sized frames that fit in the inference size into one
+        reused (B, 3, H, W) RGB float tensor (pinned on CUDA machines), so
+        ultralytics skips its letterbox and per-call allocations. Frames
+        smaller than imgsz (e.g. 480x360 in 480x384) sit at the top-left with
+        letterbox-gray padding below/right, so box coordinates need no
+        rescaling and the picture is not stretched. Other sizes are passed
+        through for ultralytics' own preprocessing.
+        """
+        shape = frames[0].shape[:2]
+        if (self.imgsz is None or any(f.shape[:2] != shape for f in frames)
+                or shape[0] > self.imgsz[0] or shape[1] > self.imgsz[1]):
+            return frames if len(frames) > 1 else frames[0]
+
+        h, w = self.imgsz
+        fh, fw = shape
+        tensor, filled_for = self.input_bufs.get(len(frames), (None, None))
+        if tensor is None:
+            tensor = torch.empty((len(frames), 3, h, w), dtype=torch.float32,
+                                 pin_memory=torch.cuda.is_available())
+        if filled_for != shape:
+            # Padding is never overwritten by frames, so it is set once per size
+            tensor.fill_(114 / 255)
+            self.input_bufs[len(frames)] = (tensor, shape)
+        if self.rgb_buf is None or self.rgb_buf.shape[:2] != shape:
+            self.rgb_buf = np.empty((fh, fw, 3), dtype=np.uint8)
+
+        host = tensor.numpy()
+        for i, frame in enumerate(frames):
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self.rgb_buf)
+            np.multiply(self.rgb_buf.transpose(2, 0, 1), 1 / 255,
+                        out=host[i, :, :fh, :fw], casting="unsafe")
+        return tensor
+
+    def _run_model(self, source, mode):
+        """
+        Run track()/predict(). The first call sets up ultralytics' predictor
+        (argument parsing, tracker callbacks, warmup); later calls in the same
+        mode go straight to the predictor and skip that per-call setup.
+        """
+        predictor = self.model.predictor
+        if predictor is not None and self.predictor_mode == mode:
+            return predictor(source=source, stream=False)
+
+        if mode == "track":
+            results = self.model.track(
+                source,
+                persist=True,
+                tracker="bytetrack.yaml",  # ByteTrack doesn't require lap
+                **self.infer_args
             )
+        else:
+            results = self.model.predict(source, **self.infer_args)
+        self.predictor_mode = mode
+        return results
+
+    def _track(self, stream_id, r):
+        """Run the stream's own ByteTrack tracker on a predict() result."""
+        try:
+            tracker = self.trackers.get(stream_id)
+            if tracker is None:
+                from ultralytics.trackers.byte_tracker import BYTETracker
+                from ultralytics.utils import IterableSimpleNamespace, yaml_load
+                from ultralytics.utils.checks import check_yaml
 
-        persons = []
+                cfg = IterableSimpleNamespace(**yaml_load(check_yaml("bytetrack.yaml")))
+                tracker = self.trackers[stream_id] = BYTETracker(args=cfg, frame_rate=30)
 
-        for r in results:
-            if r.boxes is None or r.keypoints is None:
-                continue
+            # Same steps as ultralytics' own on_predict_postprocess_end callback
+            det = r.boxes.cpu().numpy()
+            if len(det) == 0:
+                return r
+            tracks = tracker.update(det, r.orig_img)
+            if len(tracks) == 0:
+                return r
+            r = r[tracks[:, -1].astype(int)]
+            r.update(boxes=torch.as_tensor(tracks[:, :-1]))
+            return r
+        except Exception as e:
+            if not self.tracking_error_shown:
+                print(f"⚠️  Tracking disabled due to error: {e}")
+                print("   Using detection-only mode. See docs/raspberry_pi_lap_fix.md")
+                self.tracking_error_shown = True
+            self.use_tracking = False
+            return r
 
-            for i, box in enumerate(r.boxes):
-                # Try to get tracking ID, or generate one
-                if box.id is not None:
-                    person_id = int(box.id[0])
-                else:
-                    # Fallback ID generation
-                    person_id = self.next_id
-                    self.next_id += 1
+    def _parse_result(self, r):
+        """
+        Convert one ultralytics result into Detections. Centers are computed
+        on the result's device and everything is packed into one tensor, so
+        there is a single device-to-host copy (one CUDA sync) per frame.
+        """
+        if r.boxes is None or r.keypoints is None or len(r.boxes) == 0:
+            return Detections.empty()
 
-                x1, y1, x2, y2 = map(int, box.xyxy[0])
-                conf = float(box.conf[0])
+        boxes = r.boxes
+        n = len(boxes)
+        xyxy = boxes.xyxy.float()
+        dev = xyxy.device
+        centers = 0.5 * (xyxy[:, :2] + xyxy[:, 2:])
+        has_ids = boxes.id is not None
+        ids = boxes.id.float() if has_ids else torch.zeros(n, device=dev)
 
-                kps = r.keypoints.xy[i].tolist()
+        # One row per person in the Detections.PACKED_COLS layout
+        packed = torch.cat([
+            xyxy,
+            centers,
+            boxes.conf.float().to(dev).unsqueeze(1),
+            ids.to(dev).unsqueeze(1),
+            r.keypoints.xy.float().to(dev).reshape(n, -1),
+        ], 1).cpu().numpy()
 
-                persons.append({
-                    "id": person_id,
-                    "bbox": (x1, y1, x2, y2),
-                    "keypoints": kps,
-                    "confidence": round(conf, 2)
-                })
+        if not has_ids:
+            # Fallback ID generation
+            packed[:, 7] = np.arange(self.next_id, self.next_id + n)
+            self.next_id += n
 
-        return persons
+        return Detections.from_packed(packed)
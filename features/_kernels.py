@@ -0,0 +1,91 @@
+"""
+Batched feature extraction (and logistic-regression scoring) for all persons
+in a frame in one call.
+
+Numba is optional: without it the same functions run as NumPy expressions.
+Same features as FeatureExtractor.extract(), without its rounding.
+"""
+import math
+
+import numpy as np
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# COCO keypoint indices
+HEAD, L_SHOULDER, R_SHOULDER, L_HIP, R_HIP = 0, 5, 6, 11, 12
+
+
+def _extract_loop(kps, out):
+    for i in range(kps.shape[0]):
+        mx = 0.5 * (kps[i, L_HIP, 0] + kps[i, R_HIP, 0])
+        my = 0.5 * (kps[i, L_HIP, 1] + kps[i, R_HIP, 1])
+        dx = kps[i, HEAD, 0] - mx
+        dy = kps[i, HEAD, 1] - my
+        body_height = math.sqrt(dx * dx + dy * dy)
+        sx = kps[i, L_SHOULDER, 0] - kps[i, R_SHOULDER, 0]
+        sy = kps[i, L_SHOULDER, 1] - kps[i, R_SHOULDER, 1]
+        shoulder_width = math.sqrt(sx * sx + sy * sy)
+        out[i, 0] = body_height
+        out[i, 1] = shoulder_width / body_height if body_height != 0 else 0.0
+
+
+def _extract_features_loop(kps):
+    out = np.empty((kps.shape[0], 2), dtype=np.float32)
+    _extract_loop(kps, out)
+    return out
+
+
+def _extract_and_score_loop(kps, weights, bias):
+    out = np.empty((kps.shape[0], 3), dtype=np.float32)
+    _extract_loop(kps, out)
+    for i in range(kps.shape[0]):
+        z = weights[0] * out[i, 0] + weights[1] * out[i, 1] + bias
+        out[i, 2] = 1.0 / (1.0 + math.exp(-z))
+    return out
+
+
+def _extract_features_numpy(kps):
+    mid_hip = 0.5 * (kps[:, L_HIP] + kps[:, R_HIP])
+    torso = kps[:, HEAD] - mid_hip
+    shoulders = kps[:, L_SHOULDER] - kps[:, R_SHOULDER]
+    body_height = np.hypot(torso[:, 0], torso[:, 1])
+    shoulder_width = np.hypot(shoulders[:, 0], shoulders[:, 1])
+    ratio = np.divide(shoulder_width, body_height,
+                      out=np.zeros_like(body_height), where=body_height != 0)
+    return np.stack([body_height, ratio], axis=1).astype(np.float32)
+
+
+def _extract_and_score_numpy(kps, weights, bias):
+    feats = _extract_features_numpy(kps)
+    out = np.empty((len(feats), 3), dtype=np.float32)
+    out[:, :2] = feats
+    out[:, 2] = 1.0 / (1.0 + np.exp(-(feats @ weights + bias)))
+    return out
+
+
+if HAS_NUMBA:
+    _extract_loop = njit(fastmath=True, cache=True)(_extract_loop)
+    extract_features = njit(
+        ["f4[:,:](f4[:,:,::1])"], fastmath=True, cache=True
+    )(_extract_features_loop)
+    extract_and_score = njit(
+        ["f4[:,:](f4[:,:,::1], f8[::1], f8)"], fastmath=True, cache=True
+    )(_extract_and_score_loop)
+else:
+    extract_features = _extract_features_numpy
+    extract_and_score = _extract_and_score_numpy
+
+extract_features.__doc__ = """
+    kps: (N, 17, 2) C-contiguous float32 keypoints
+    Returns (N, 2) float32 rows of [body_height, shoulder_body_ratio].
+    """
+
+extract_and_score.__doc__ = """
+    kps: (N, 17, 2) C-contiguous float32 keypoints
+    weights: (2,) float64 logistic-regression coefficients, bias: float
+    Returns (N, 3) float32 rows of [body_height, shoulder_body_ratio, P(class 1)].
+    """
@@ -1,26 +1,23 @@
-import math
+import numpy as np
+
+# Keypoints used by the features: head, shoulders, hips (COCO order)
+FEATURE_KEYPOINTS = [0, 5, 6, 11, 12]
 
 class FeatureExtractor:
     def extract(self, keypoints):
         """
-        keypoints: list of (x, y) from YOLOv8 pose
+        keypoints: (17, 2) float32 ndarray from YOLOv8 pose, normally a view
+                   into Detections.kps (no copy); lists of (x, y) still work
         """
+        pts = np.asarray(keypoints, dtype=np.float32)[FEATURE_KEYPOINTS]
+        mid_hip = pts[3:5].mean(axis=0)
 
-        def dist(p1, p2):
-            return math.sqrt((p1[0]-p2[0])**2 + (p1[1]-p2[1])**2)
-
-        head = keypoints[0]
-        left_shoulder = keypoints[5]
-        right_shoulder = keypoints[6]
-        left_hip = keypoints[11]
-        right_hip = keypoints[12]
-
-        body_height = dist(head, ((left_hip[0]+right_hip[0])/2,
-                                  (left_hip[1]+right_hip[1])/2))
-        shoulder_width = dist(left_shoulder, right_shoulder)
+        # head->mid-hip and shoulder->shoulder vectors, both lengths in one call
+        diffs = np.stack([pts[0] - mid_hip, pts[1] - pts[2]])
+        body_height, shoulder_width = np.hypot(diffs[:, 0], diffs[:, 1])
 
         return {
-            "body_height": round(body_height, 2),
+            "body_height": round(float(body_height), 2),
             "shoulder_body_ratio": round(
-                shoulder_width / body_height if body_height != 0 else 0, 3)
+                float(shoulder_width / body_height) if body_height != 0 else 0, 3)
         }
@@ -0,0 +1,66 @@
+"""
+Compiled per-frame kernels for the supervision logic.
+
+Numba is optional: without it the same functions run as NumPy broadcasts.
+"""
+import numpy as np
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# Largest float32, used instead of inf so fastmath may assume finite values
+_FAR = np.float32(3.4e38)
+
+
+def _nearest_adult_loop(children_xy, adults_xy):
+    n = children_xy.shape[0]
+    m = adults_xy.shape[0]
+    result = np.empty((n, 2), dtype=np.float32)
+    for i in range(n):
+        cx = children_xy[i, 0]
+        cy = children_xy[i, 1]
+        best = _FAR
+        best_j = -1
+        for j in range(m):
+            dx = adults_xy[j, 0] - cx
+            dy = adults_xy[j, 1] - cy
+            d2 = dx * dx + dy * dy
+            if d2 < best:
+                best = d2
+                best_j = j
+        result[i, 0] = best_j
+        result[i, 1] = best
+    return result
+
+
+def _nearest_adult_numpy(children_xy, adults_xy):
+    result = np.empty((children_xy.shape[0], 2), dtype=np.float32)
+    if adults_xy.shape[0] == 0:
+        result[:, 0] = -1
+        result[:, 1] = _FAR
+        return result
+    diff = children_xy[:, None, :] - adults_xy[None, :, :]
+    # Fused square-and-sum, no (N, M, 2) temporary for diff * diff
+    d2 = np.einsum("ijk,ijk->ij", diff, diff)
+    idx = d2.argmin(axis=1)
+    result[:, 0] = idx
+    result[:, 1] = d2[np.arange(len(idx)), idx]
+    return result
+
+
+if HAS_NUMBA:
+    nearest_adult = njit(
+        ["f4[:,:](f4[:,:], f4[:,:])"], fastmath=True, cache=True
+    )(_nearest_adult_loop)
+else:
+    nearest_adult = _nearest_adult_numpy
+
+nearest_adult.__doc__ = """
+    children_xy: (N, 2) float32 child centers
+    adults_xy: (M, 2) float32 adult centers
+    Returns (N, 2) float32 rows of [nearest adult index, squared distance];
+    the index is -1 when there are no adults.
+    """
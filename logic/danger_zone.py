@@ -1,3 +1,5 @@
+import numpy as np
+
 class DangerZone:
     def __init__(self, frame_width, frame_height):
         self.frame_width = frame_width
@@ -8,9 +10,31 @@ class DangerZone:
         self.y1 = 0
         self.x2 = frame_width
         self.y2 = frame_height
+        self.zone = (self.x1, self.y1, self.x2, self.y2)  # Built once, not per frame
+
+        # Inside/outside lookup table with a one-pixel False border, so any
+        # point is classified by clipping it onto the border and indexing.
+        # Works the same for any zone shape painted into it.
+        self.lut = np.zeros((frame_height + 3, frame_width + 3), dtype=bool)
+        self.lut[self.y1 + 1:self.y2 + 2, self.x1 + 1:self.x2 + 2] = True
+        self.lut_max = np.array([frame_width + 2, frame_height + 2])
 
     def is_inside(self, x, y):
-        return self.x1 <= x <= self.x2 and self.y1 <= y <= self.y2
+        # Branchless: all four edge distances are >= 0 only when inside,
+        # so OR-ing them leaves the sign bit clear (integer pixel coords)
+        x, y = int(x), int(y)
+        return ((x - self.x1) | (self.x2 - x) | (y - self.y1) | (self.y2 - y)) >= 0
+
+    def mask(self, pts):
+        """pts: (N, 2) array of (x, y) -> (N,) bool array, True inside the zone."""
+        pts = np.asarray(pts).reshape(-1, 2)
+        if pts.dtype.kind == "f":
+            pts = np.floor(pts)
+        idx = np.clip(pts.astype(np.intp) + 1, 0, self.lut_max)
+        return self.lut[idx[:, 1], idx[:, 0]]
+
+    # Batch name used by callers that test all persons at once
+    is_inside_batch = mask
 
     def get_zone(self):
-        return (self.x1, self.y1, self.x2, self.y2)
+        return self.zone
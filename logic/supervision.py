@@ -1,4 +1,5 @@
-import math
+import numpy as np
+
 
 class SupervisionChecker:
     def __init__(self):
@@ -6,25 +7,46 @@ class SupervisionChecker:
         self.MAX_DISTANCE = 120      # pixels
         self.MIN_MOTION = 3.0        # pixels per frame
 
+        # Compared against squared distances, so no sqrt is needed
+        self.MAX_DISTANCE_SQ = self.MAX_DISTANCE ** 2
+        self.MIN_MOTION_SQ = self.MIN_MOTION ** 2
+
         self.prev_positions = {}
 
-    def distance(self, p1, p2):
-        return math.sqrt((p1[0] - p2[0])**2 + (p1[1] - p2[1])**2)
+    def _dist_sq(self, p1, p2):
+        dx = p1[0] - p2[0]
+        dy = p1[1] - p2[1]
+        return dx * dx + dy * dy
 
-    def motion_speed(self, pid, pos):
+    def motion_speed_sq(self, pid, pos):
         if pid not in self.prev_positions:
             self.prev_positions[pid] = pos
             return 0.0
 
         prev = self.prev_positions[pid]
-        speed = self.distance(prev, pos)
+        speed_sq = self._dist_sq(prev, pos)
         self.prev_positions[pid] = pos
-        return speed
+        return speed_sq
+
+    def is_attentive(self, adult_id, adult_pos, child_pos, dist_sq=None):
+        """dist_sq: squared adult-child distance, if the caller already has it."""
+        if dist_sq is None:
+            dist_sq = self._dist_sq(adult_pos, child_pos)
+        speed_sq = self.motion_speed_sq(adult_id, adult_pos)
 
-    def is_attentive(self, adult_id, adult_pos, child_pos):
-        dist = self.distance(adult_pos, child_pos)
-        speed = self.motion_speed(adult_id, adult_pos)
+        return dist_sq < self.MAX_DISTANCE_SQ and speed_sq > self.MIN_MOTION_SQ
 
-        if dist < self.MAX_DISTANCE and speed > self.MIN_MOTION:
-            return True
-        return False
+    def attentive_matrix(self, adult_ids, adult_xy, child_xy):
+        """
+        adult_ids: M adult track ids
+        adult_xy: (M, 2) adult positions, child_xy: (N, 2) child positions
+        Returns (N, M) bool: adult j is attentive to child i. Each adult's
+        motion is sampled once per call, however many children there are.
+        """
+        adult_xy = np.asarray(adult_xy, dtype=np.float32).reshape(-1, 2)
+        child_xy = np.asarray(child_xy, dtype=np.float32).reshape(-1, 2)
+        moving = np.array([self.motion_speed_sq(aid, tuple(pos)) > self.MIN_MOTION_SQ
+                           for aid, pos in zip(adult_ids, adult_xy)], dtype=bool)
+        diff = child_xy[:, None, :] - adult_xy[None, :, :]
+        dist_sq = np.einsum("ijk,ijk->ij", diff, diff)
+        return (dist_sq < self.MAX_DISTANCE_SQ) & moving[None, :]
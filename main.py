@@ -1,8 +1,11 @@
 import argparse
+import math
+import os
 import sys
-import cv2
 import time
-from collections import defaultdict
+import cv2
+import numpy as np
+from collections import deque
 
 # Platform-specific audio support
 try:
@@ -11,14 +14,17 @@ try:
 except ImportError:
     HAS_WINSOUND = False
 
-from detectors.yolo_person_detector import YOLOPersonDetector
-from features.feature_extractor import FeatureExtractor
+from detectors.process_pool import ProcessDetectorPool
+from detectors.yolo_person_detector import Detections, YOLOPersonDetector
 from classifiers.role_classifier import RoleClassifier
 from logic.danger_zone import DangerZone
 from logic.supervision import SupervisionChecker
+from logic._fast import nearest_adult
 from utils.dataset_logger import DatasetLogger
-from utils.firebase_uploader import FirebaseUploader
+from utils.firebase_uploader import AsyncUploader, FirebaseUploader
 from utils.camera import ThreadedCamera
+from utils.display import create_display
+from utils.draw_utils import Overlay
 
 
 def parse_args():
@@ -29,7 +35,8 @@ def parse_args():
 		"--source",
 		type=str,
 		default="0",
-		help="Video source: camera index (e.g., 0), video path, or streaming URL",
+		help="Video source: camera index (e.g., 0), video path, or streaming URL. "
+		"Separate several sources with commas to batch them through one detector",
 	)
 	parser.add_argument(
 		"--no-display",
@@ -51,7 +58,12 @@ def parse_args():
 		"--skip-frames",
 		type=int,
 		default=5,
-		help="Process detection every N frames for better FPS (default: 5)",
+		help="Upper bound for the adaptive detection interval, in frames (default: 5)",
+	)
+	parser.add_argument(
+		"--fixed-skip",
+		action="store_true",
+		help="Always detect every --skip-frames frames instead of adapting to inference time",
 	)
 	parser.add_argument(
 		"--target-fps",
@@ -63,32 +75,132 @@ def parse_args():
 		"--resolution",
 		type=str,
 		default="480x360",
-		help="Video resolution WxH (default: 480x360 for stability)",
+		help="Video resolution WxH; inference pads it up to multiples of 32 (default: 480x360 for stability)",
+	)
+	parser.add_argument(
+		"--no-tensorrt",
+		action="store_true",
+		help="Run the PyTorch model instead of a TensorRT (GPU) or OpenVINO (x86 CPU) export",
+	)
+	parser.add_argument(
+		"--display-backend",
+		choices=["opencv", "gstreamer", "pygame"],
+		default="opencv",
+		help="Window backend: OpenCV HighGUI, an asynchronous GStreamer sink (quit with Ctrl+C), "
+		"or a low-latency SDL window via pygame",
+	)
+	parser.add_argument(
+		"--process-per-camera",
+		action="store_true",
+		help="With several sources, run one detector process per camera instead of one batched detector",
+	)
+	parser.add_argument(
+		"--int8",
+		action="store_true",
+		help="Build the TensorRT engine with INT8 calibration (needs --calib-data)",
+	)
+	parser.add_argument(
+		"--calib-data",
+		type=str,
+		default=None,
+		help="Calibration dataset yaml from scripts/collect_calibration.py",
 	)
 	return parser.parse_args()
 
 
-def center_of_bbox(bbox):
-	x1, y1, x2, y2 = bbox
-	return int((x1 + x2) / 2), int((y1 + y2) / 2)
+def parse_source(source):
+	"""Resolve a capture source (camera index vs path/URL)."""
+	return int(source) if source.isdigit() else source
 
 
-def draw_person(frame, bbox, role, prob, color, extra_note=None, flash=False):
+MAX_TRACK_IDS = 1024  # Per-child state slots; track ids wrap around modulo this
+ALERT_COOLDOWN_SECONDS = 3  # Minimum seconds between alerts for same child
+
+
+class StreamState:
+	"""Per-camera frame, detection and crossing state used by the main loop."""
+
+	def __init__(self, src, cap, window_name):
+		self.src = src
+		self.cap = cap
+		self.window_name = window_name
+		self.frame = None
+		self.fresh = False  # frame was decoded this iteration
+		self.overlay = Overlay()  # Annotations for the current frame
+		self.danger_zone = None
+
+		# Frame timeout tracking
+		self.frame_timeout_counter = 0
+		self.frame_received = False
+
+		# Child tracking for line crossing detection
+		self.child_zone_status = np.zeros(MAX_TRACK_IDS, dtype=bool)  # Track if child was in zone
+		self.alert_cooldown = np.full(MAX_TRACK_IDS, -np.inf)  # Last alert time per child (monotonic)
+
+		# Cache last detection results
+		self.last_persons = Detections.empty()
+		self.role_cache = {}  # track id -> [is_adult, prob, expires_at, last_seen]
+		self.role_tick = 0  # Analysed frames, the clock for role_cache
+		self.children = []
+		self.adults = []
+		self.children_in_danger = []
+		self.status = "safe"
+
+
+STATUS_SEVERITY = {"safe": 0, "warning": 1, "danger": 2}
+
+ROLE_TTL = 30  # Analysed frames a cached role is reused before re-classifying
+ROLE_EVICT = 60  # Forget ids unseen for this many analysed frames
+
+
+def draw_person(overlay, bbox, role, prob, color, extra_note=None, flash=False):
 	x1, y1, x2, y2 = bbox
 	thickness = 4 if flash else 2
-	cv2.rectangle(frame, (x1, y1), (x2, y2), color, thickness)
+	overlay.rect((x1, y1), (x2, y2), color, thickness)
 	label = f"{role} {prob:.2f}"
 	if extra_note:
 		label = f"{label} | {extra_note}"
-	cv2.putText(
-		frame,
-		label,
-		(x1, max(20, y1 - 10)),
-		cv2.FONT_HERSHEY_SIMPLEX,
-		0.6,
-		color,
-		2,
-	)
+	overlay.text(label, (x1, max(20, y1 - 10)), 0.6, color, 2)
+
+
+def cached_roles(stream, dets, classifier):
+	"""Roles for a frame's persons; only ids without a live cache entry are classified."""
+	stream.role_tick += 1
+	tick = stream.role_tick
+	cache = stream.role_cache
+	n = len(dets)
+	is_adult = np.empty(n, dtype=bool)
+	probs = np.empty(n, dtype=np.float32)
+
+	missing = []
+	for i, pid in enumerate(dets.ids.tolist()):
+		entry = cache.get(pid)
+		if entry is not None and entry[2] > tick:
+			is_adult[i], probs[i] = entry[0], entry[1]
+			entry[3] = tick
+		else:
+			missing.append(i)
+
+	if missing:
+		_, adult, prob = classifier.classify_keypoints(dets.kps[missing])
+		for k, i in enumerate(missing):
+			is_adult[i] = adult[k]
+			probs[i] = prob[k]
+			cache[int(dets.ids[i])] = [bool(adult[k]), float(prob[k]), tick + ROLE_TTL, tick]
+
+	if tick % ROLE_EVICT == 0:
+		for pid in [pid for pid, entry in cache.items() if tick - entry[3] > ROLE_EVICT]:
+			del cache[pid]
+	return is_adult, probs
+
+
+def sleep_until(deadline):
+	"""Sleep until a time.monotonic_ns() deadline, spinning for the last 2 ms that sleep() tends to overshoot."""
+	remaining = deadline - time.monotonic_ns()
+	if remaining > 2_000_000:
+		time.sleep((remaining - 2_000_000) / 1e9)
+	while time.monotonic_ns() < deadline:
+		pass
 
 
 def trigger_alert(alert_type="danger"):
@@ -110,10 +222,8 @@ def trigger_alert(alert_type="danger"):
 def main():
 	args = parse_args()
 
-	# Resolve capture source (camera index vs path)
-	src = args.source
-	if src.isdigit():
-		src = int(src)
+	# Resolve capture sources (comma-separated for multiple cameras)
+	sources = [parse_source(s.strip()) for s in args.source.split(",") if s.strip()]
 
 	# Parse resolution
 	try:
@@ -122,50 +232,94 @@ def main():
 		res_width, res_height = 480, 360
 		print(f"Invalid resolution format, using default: {res_width}x{res_height}")
 
-	print(f"Connecting to video source: {src}")
+	# Inference size: the capture size rounded up to the model stride. The
+	# detector pads frames into it (no stretching, coordinates unchanged),
+	# so ultralytics' letterbox neither resizes nor pads
+	stride = 32
+	infer_width = -(-res_width // stride) * stride
+	infer_height = -(-res_height // stride) * stride
+
+	# OpenCV's worker pool would compete with inference for cores; its
+	# per-frame calls are on small frames and are cheapest run inline
+	cv2.setNumThreads(1)
+
+	# With enough cores, capture threads get the first one and everything
+	# else (inference, drawing, uploads) inherits the rest
+	capture_cpu = None
+	if hasattr(os, "sched_getaffinity"):
+		cpus = sorted(os.sched_getaffinity(0))
+		if len(cpus) >= 4:
+			capture_cpu = cpus[0]
+			os.sched_setaffinity(0, set(cpus[1:]))
+
+	print(f"Connecting to video source(s): {', '.join(str(src) for src in sources)}")
 	print(f"Target resolution: {res_width}x{res_height}")
 	print(f"Target FPS: {args.target_fps}")
 	
-	# Use longer timeout for network streams
-	timeout = 30 if isinstance(src, str) and src.startswith('http') else 10
-	print(f"Using timeout: {timeout} seconds")
-	
-	cap = ThreadedCamera(src, buffer_size=1, timeout=timeout, 
-	                     target_width=res_width, target_height=res_height).start()
+	streams = []
+	for i, src in enumerate(sources):
+		# Use longer timeout for network streams
+		timeout = 30 if isinstance(src, str) and src.startswith('http') else 10
+		print(f"Using timeout: {timeout} seconds")
+		
+		cap = ThreadedCamera(src, buffer_size=1, timeout=timeout, 
+		                     target_width=res_width, target_height=res_height,
+		                     cpu=capture_cpu).start()
+		window_name = "SafeEdge Guardian" if len(sources) == 1 else f"SafeEdge Guardian [{i}]"
+		streams.append(StreamState(src, cap, window_name))
 	
-	# Give the thread time to start and grab first frame
+	# Give the threads time to start and grab first frame
 	print("Waiting for camera to initialize...")
 	time.sleep(3)
 	
-	if not cap.isOpened():
-		print("❌ ERROR: Failed to open video stream!")
-		print(f"   Source: {src}")
-		if isinstance(src, str) and src.startswith('http'):
-			print("   Troubleshooting tips for IP camera:")
-			print("   1. Check if the IP address is correct and reachable")
-			print("   2. Verify the camera app is running (e.g., IP Webcam)")
-			print("   3. Try accessing the stream URL in a web browser first")
-			print(f"   4. Try: {src}/video")
-		else:
-			print("   Troubleshooting tips for local camera:")
-			print("   1. Check if camera is connected and not in use by another program")
-			print("   2. Try running: python test_camera_simple.py")
-			print("   3. Check camera permissions in Windows Settings")
-		sys.exit(1)
+	for stream in streams:
+		src = stream.src
+		if not stream.cap.isOpened():
+			print("❌ ERROR: Failed to open video stream!")
+			print(f"   Source: {src}")
+			if isinstance(src, str) and src.startswith('http'):
+				print("   Troubleshooting tips for IP camera:")
+				print("   1. Check if the IP address is correct and reachable")
+				print("   2. Verify the camera app is running (e.g., IP Webcam)")
+				print("   3. Try accessing the stream URL in a web browser first")
+				print(f"   4. Try: {src}/video")
+			else:
+				print("   Troubleshooting tips for local camera:")
+				print("   1. Check if camera is connected and not in use by another program")
+				print("   2. Try running: python test_camera_simple.py")
+				print("   3. Check camera permissions in Windows Settings")
+			sys.exit(1)
 	
 	print("✅ Camera connected successfully!")
 
 	print("✅ Camera connected successfully!")
 	print("Stream opened successfully - using threaded capture for stable FPS")
-	print(f"Processing detection every {args.skip_frames} frames")
+	if args.fixed_skip:
+		print(f"Processing detection every {args.skip_frames} frames")
+	else:
+		print(f"Processing detection adaptively, at most every {args.skip_frames} frames")
 
 	print("\n🔄 Loading AI models...")
-	detector = YOLOPersonDetector(conf_thresh=args.confidence)
-	extractor = FeatureExtractor()
+	detector_kwargs = dict(
+		conf_thresh=args.confidence,
+		imgsz=(infer_height, infer_width),
+		use_tensorrt=not args.no_tensorrt,
+		int8=args.int8,
+		calib_data=args.calib_data,
+	)
+	if args.process_per_camera and len(streams) > 1:
+		detector = ProcessDetectorPool(len(streams), (res_height, res_width, 3), **detector_kwargs)
+	else:
+		detector = YOLOPersonDetector(batch=len(streams), **detector_kwargs)
+		detector.warmup()
+		detector.start_async()
 	classifier = RoleClassifier()
 	supervisor = SupervisionChecker()
 	logger = DatasetLogger() if args.log_dataset else None
-	firebase = FirebaseUploader()
+	firebase = AsyncUploader(FirebaseUploader())
+
+	# Prime the per-person path too, so the first real frame runs at full speed
+	classifier.classify_keypoints(np.zeros((1, 17, 2), dtype=np.float32))
 	print("✅ All models loaded!")
 	
 	# Track status changes and frame counter
@@ -173,228 +327,249 @@ def main():
 	frame_counter = 0
 	upload_interval = 30  # Upload every 30 frames
 	
-	# Child tracking for line crossing detection
-	child_zone_status = defaultdict(lambda: False)  # Track if child was in zone
-	alert_cooldown = {}  # Track last alert time per child
-	ALERT_COOLDOWN_SECONDS = 3  # Minimum seconds between alerts for same child
 	
 	# Performance optimization: skip frames for detection
 	process_every_n_frames = args.skip_frames  # Process detection every Nth frame
+	last_schedule = time.monotonic_ns()  # Adaptive interval is re-evaluated every second
 	frame_skip_counter = 0
 	
-	# FPS tracking and frame timing
-	fps_start_time = time.time()
-	fps_frame_count = 0
+	# FPS tracking and frame timing (monotonic nanoseconds)
+	frame_stamps = deque(maxlen=30)  # Loop timestamps of the last 30 frames
 	fps_display = 0
-	frame_time = 1.0 / args.target_fps  # Target time per frame
-	last_frame_time = time.time()
-	
-	# Frame timeout tracking
-	last_valid_frame = None
-	frame_timeout_counter = 0
+	frame_period = int(1e9 / args.target_fps)  # Target time per frame
+	deadline = time.monotonic_ns()
 	
 	# Stream health monitoring
-	last_health_check = time.time()
-	health_check_interval = 30  # Check stream health every 30 seconds
-	
-	# Cache last detection results
-	last_persons = []
-	last_children = []
-	last_adults = []
-	last_global_status = "safe"
-
-	# Get first frame to determine dimensions
-	danger_zone = None
+	last_health_check = deadline
+	health_check_interval = 30 * 10**9  # Check stream health every 30 seconds
 
 	print("\n🚀 Starting SafeEdge Guardian surveillance...")
 	print("PHASE 7: ADULT SUPERVISION ACTIVE")
 	print("Firebase Integration: Enabled")
 	if not args.no_display:
+		display = create_display(args.display_backend, fps=args.target_fps, num_windows=len(streams))
 		print("📹 Video window will open shortly - Press 'q' to quit")
 	else:
 		print("Running in headless mode (no display)")
 	print("-" * 50)
 
-	frame_received = False
 	while True:
-		# Maintain consistent frame timing
-		current_time = time.time()
-		elapsed = current_time - last_frame_time
-		
-		# Skip if too soon (enforce target FPS)
-		if elapsed < frame_time:
-			time.sleep(frame_time - elapsed)
-			current_time = time.time()
-		
-		last_frame_time = current_time
+		now = time.monotonic_ns()
+		frame_stamps.append(now)
 		
-		ret, frame = cap.read()
-		if not ret or frame is None:
-			# Use last valid frame to maintain display
-			frame_timeout_counter += 1
-			if last_valid_frame is not None and frame_timeout_counter < 100:
-				# Reuse last frame for up to 10 seconds
-				frame = last_valid_frame.copy()
+		frame_skip_counter += 1
+		detect_due = frame_skip_counter >= process_every_n_frames
+
+		stream_lost = False
+		for stream in streams:
+			# Only ask for frames that are going to be analysed or displayed;
+			# each retrieve() makes the camera thread decode one more frame
+			new_frame = stream.cap.grab()
+			if new_frame and (detect_due or not args.no_display or stream.frame is None):
+				ret, frame = stream.cap.retrieve()
 			else:
-				if not frame_received:
-					print("❌ ERROR: No frames received from camera!")
-					print("   The stream may be unavailable or the wrong URL/device.")
+				ret, frame = False, None
+
+			if not ret or frame is None:
+				# Decode skipped on purpose (or still pending) is not a timeout
+				if new_frame:
+					stream.frame_timeout_counter = 0
 				else:
-					print("Stream lost - no frames available")
-				break
-		else:
-			# Got a valid frame
-			if not frame_received:
-				print("✅ First frame received! Processing...")
-				frame_received = True
-			last_valid_frame = frame.copy()
-			frame_timeout_counter = 0
-
-		# Skip invalid frames
-		if frame is None or frame.size == 0:
-			continue
+					stream.frame_timeout_counter += 1
+				# Keep the last frame (and its overlays) on screen for up to 10 seconds
+				if (stream.frame is None and not new_frame) or stream.frame_timeout_counter >= 100:
+					if not stream.frame_received:
+						print(f"❌ ERROR: No frames received from camera {stream.src}!")
+						print("   The stream may be unavailable or the wrong URL/device.")
+					else:
+						print(f"Stream lost - no frames available from {stream.src}")
+					stream_lost = True
+					break
+			else:
+				# Got a valid frame
+				if not stream.frame_received:
+					print("✅ First frame received! Processing...")
+					stream.frame_received = True
+				# No copy: the camera's ping-pong buffer stays valid until the
+				# next-but-one retrieve(), and stream.frame doubles as the
+				# last valid frame
+				stream.frame_timeout_counter = 0
+				stream.frame = frame
+
+			stream.fresh = ret
+		if stream_lost:
+			break
 		
 		# Periodic stream health check
-		current_time_check = time.time()
-		if current_time_check - last_health_check > health_check_interval:
-			health = cap.get_stream_health()
-			if not health["is_healthy"]:
-				print(f"⚠️ Stream health warning: {health['seconds_since_frame']:.1f}s since last frame")
-			last_health_check = current_time_check
-
-		# Initialize danger zone on first frame
-		h, w = frame.shape[:2]
-		if danger_zone is None:
-			danger_zone = DangerZone(w, h)
-
-		# Draw danger zone area
-		zx1, zy1, zx2, zy2 = danger_zone.get_zone()
-		cv2.rectangle(frame, (zx1, zy1), (zx2, zy2), (0, 0, 255), 3)
-		cv2.putText(
-			frame,
-			"DANGER ZONE",
-			(zx1 + 5, 30),
-			cv2.FONT_HERSHEY_SIMPLEX,
-			0.8,
-			(0, 0, 255),
-			2,
-		)
-
-		# Process detection only every Nth frame for better performance
-		frame_skip_counter += 1
-		if frame_skip_counter >= process_every_n_frames:
+		if now - last_health_check > health_check_interval:
+			for stream in streams:
+				health = stream.cap.get_stream_health()
+				if not health["is_healthy"]:
+					print(f"⚠️ Stream health warning ({stream.src}): {health['seconds_since_frame']:.1f}s since last frame")
+			last_health_check = now
+
+		# Submit detection every Nth frame, and only on freshly decoded ones
+		fresh = [(i, stream) for i, stream in enumerate(streams) if stream.fresh]
+		if detect_due and fresh:
 			frame_skip_counter = 0
-			try:
-				persons = detector.detect(frame)
-				last_persons = persons
-			except Exception as e:
-				print(f"Detection error: {e}")
-				persons = last_persons
-		else:
-			# Reuse last detection results
-			persons = last_persons
-
-		children = []  # list of tuples (id, center)
-		adults = []  # list of tuples (id, center)
-
-		# Per-person processing
-		for p in persons:
-			bbox = p["bbox"]
-			kps = p.get("keypoints", [])
-			if not kps or len(kps) < 13:
-				# Not enough keypoints for our feature set
-				continue
-
-			feats = extractor.extract(kps)
-			role, prob = classifier.classify(feats)
-
-			cx, cy = center_of_bbox(bbox)
+			# One batched forward pass for all cameras, run in the background
+			detector.submit(
+				[stream.frame for _, stream in fresh],
+				[i for i, _ in fresh],
+			)
 
-			# Log predicted sample if requested
-			if logger is not None:
-				logger.log(p["id"], feats, role)
+		# Pick up finished detections (about one frame behind the capture)
+		result = detector.next_result()
+		if result is not None:
+			for i, det_frame, persons in result:
+				stream = streams[i]
+				stream.last_persons = persons
+				if not stream.fresh:
+					# Nothing newer was decoded: analyse the detection's own frame
+					stream.frame = det_frame
+					stream.fresh = True
+
+		for stream in streams:
+			# Nothing new to analyse; the cached status stays in effect
+			if not stream.fresh:
+				continue
+			frame = stream.frame
+			
+			# Initialize danger zone on first frame
+			h, w = frame.shape[:2]
+			overlay = stream.overlay
+			if stream.danger_zone is None:
+				stream.danger_zone = DangerZone(w, h)
+
+				# Danger zone area never changes: rendered once
+				zx1, zy1, zx2, zy2 = stream.danger_zone.get_zone()
+				overlay.add_static_rect((zx1, zy1), (zx2, zy2), (0, 0, 255), 3)
+				overlay.add_static_text("DANGER ZONE", (zx1 + 5, 30), 0.8, (0, 0, 255), 2)
+			danger_zone = stream.danger_zone
+			overlay.clear()
+
+			# Reuse last detection results between detection frames
+			dets = stream.last_persons
+			child_zone_status = stream.child_zone_status
+			alert_cooldown = stream.alert_cooldown
+
+			# Per-person arrays (structure of arrays)
+			n = len(dets)
+			centers = dets.centers()
+			# Not enough keypoints for our feature set (decided per model
+			# output, so it holds for the whole frame)
+			valid = dets.kp_valid
+
+			# Features and role for every person in one batched call; tracked
+			# ids reuse their cached role unless samples are being logged
+			if n and valid[0] and logger is None:
+				is_adult, probs = cached_roles(stream, dets, classifier)
+			elif n and valid[0]:
+				feats, is_adult, probs = classifier.classify_keypoints(dets.kps)
+
+				# Log predicted samples if requested
+				if logger is not None:
+					for i in range(n):
+						logger.log(int(dets.ids[i]), {
+							"body_height": round(float(feats[i, 0]), 2),
+							"shoulder_body_ratio": round(float(feats[i, 1]), 3),
+						}, "ADULT" if is_adult[i] else "CHILD")
+			else:
+				is_adult = np.zeros(n, dtype=bool)
+				probs = np.zeros(n, dtype=np.float32)
 
 			# Who is where
-			if role == "ADULT":
-				adults.append((p["id"], (cx, cy)))
-				draw_person(frame, bbox, role, prob, (0, 165, 255))
-			else:  # CHILD
-				children.append((p["id"], (cx, cy)))
-				in_zone = danger_zone.is_inside(cx, cy)
-				
-				# Detect line crossing (child entering danger zone)
-				child_id = p["id"]
-				was_in_zone = child_zone_status[child_id]
-				
-				# Check if this is a new crossing event
-				if in_zone and not was_in_zone:
-					# Child just crossed INTO danger zone!
-					current_time = time.time()
-					last_alert_time = alert_cooldown.get(child_id, 0)
-					
-					if current_time - last_alert_time > ALERT_COOLDOWN_SECONDS:
-						print(f"⚠️ ALERT: Child ID {child_id} crossed into DANGER ZONE!")
-						trigger_alert("danger")
-						firebase.send_alert(child_id, "danger_zone_entry", current_time)
-						alert_cooldown[child_id] = current_time
-				
-				# Update tracking status
-				child_zone_status[child_id] = in_zone
-				
+			child_idx = np.flatnonzero(valid & ~is_adult)
+			adult_idx = np.flatnonzero(valid & is_adult)
+			children_xy = centers[child_idx]
+			adults_xy = centers[adult_idx]
+
+			for i in adult_idx:
+				draw_person(overlay, tuple(dets.bbox[i].tolist()), "ADULT", probs[i], (0, 165, 255))
+
+			# Danger-zone test for all children at once
+			in_zone_mask = danger_zone.mask(children_xy)
+
+			# Detect line crossings (child entering danger zone) for all
+			# children at once; state arrays are indexed by track id slot
+			child_ids = dets.ids[child_idx]
+			slots = child_ids % MAX_TRACK_IDS
+			current_time = time.monotonic()
+			crossed = in_zone_mask & ~child_zone_status[slots]
+			alerting = crossed & (current_time - alert_cooldown[slots] > ALERT_COOLDOWN_SECONDS)
+			for child_id in child_ids[alerting].tolist():
+				# Child just crossed INTO danger zone!
+				print(f"⚠️ ALERT: Child ID {child_id} crossed into DANGER ZONE!")
+				trigger_alert("danger")
+				# Firebase gets a wall-clock timestamp
+				firebase.send_alert(child_id, "danger_zone_entry", time.time())
+			alert_cooldown[slots[alerting]] = current_time
+
+			# Update tracking status
+			child_zone_status[slots] = in_zone_mask
+
+			for i, in_zone in zip(child_idx, in_zone_mask.tolist()):
 				note = "⚠️ DANGER" if in_zone else None
 				color = (0, 0, 255) if in_zone else (0, 255, 0)  # Red if in zone
 				flash = in_zone  # Flash border if in danger zone
-				draw_person(frame, bbox, role, prob, color, note, flash)
-
-		# Evaluate supervision relative to children
-		global_status = "safe"
-		children_in_danger = []
+				draw_person(overlay, tuple(dets.bbox[i].tolist()), "CHILD", probs[i], color, note, flash)
+
+			# Evaluate supervision relative to children
+			status = "safe"
+			children_in_danger = []
+			
+			# Nearest adult for every in-zone child in one compiled call;
+			# skipped entirely while no child is in the zone
+			in_zone_idx = np.flatnonzero(in_zone_mask)
+			if len(in_zone_idx):
+				nearest = nearest_adult(children_xy[in_zone_idx], adults_xy)
+			
+			for j, k in enumerate(in_zone_idx):
+				cid = int(dets.ids[child_idx[k]])
+				cpos = children_xy[k]
+
+				nearest_idx = int(nearest[j, 0])
+				attentive = False
+				if nearest_idx >= 0:
+					aid = int(dets.ids[adult_idx[nearest_idx]])
+					# Squared distance from the nearest-adult search, no re-sqrt
+					attentive = supervisor.is_attentive(
+						aid, adults_xy[nearest_idx], cpos, dist_sq=nearest[j, 1]
+					)
+
+				if not attentive:
+					if nearest_idx < 0:
+						status = "danger"
+						children_in_danger.append(cid)
+					else:
+						if status != "danger":  # Only set warning if not already danger
+							status = "warning"
+					# Break early if danger detected
+					if status == "danger":
+						break
+				# If attentive, child is supervised - keep status safe unless already escalated
 		
-		for cid, cpos in children:
-			in_zone = danger_zone.is_inside(*cpos)
-			if not in_zone:
-				continue
-
-			# Find nearest adult
-			nearest_adult = None
-			nearest_dist = float("inf")
-			for aid, apos in adults:
-				dx = apos[0] - cpos[0]
-				dy = apos[1] - cpos[1]
-				d2 = dx * dx + dy * dy
-				if d2 < nearest_dist:
-					nearest_dist = d2
-					nearest_adult = (aid, apos)
-
-			attentive = False
-			if nearest_adult is not None:
-				aid, apos = nearest_adult
-				attentive = supervisor.is_attentive(aid, apos, cpos)
-
-			if not attentive:
-				if nearest_adult is None:
-					global_status = "danger"
-					children_in_danger.append(cid)
-				else:
-					if global_status != "danger":  # Only set warning if not already danger
-						global_status = "warning"
-				# Break early if danger detected
-				if global_status == "danger":
-					break
-			# If attentive, child is supervised - keep status safe unless already escalated
-	
-		# Cache status for next frames
-		last_global_status = global_status
-		last_children = children
-		last_adults = adults
+			# Cache status for the banner pass
+			stream.status = status
+			stream.children = dets.ids[child_idx]
+			stream.adults = dets.ids[adult_idx]
+			stream.children_in_danger = children_in_danger
+
+		# The device reports the most severe status across cameras
+		global_status = max((s.status for s in streams), key=STATUS_SEVERITY.get)
+
+		# Once a second, detect as often as inference keeps up with the
+		# frame rate; twice as often while a child is in danger
+		if not args.fixed_skip and now - last_schedule > 10**9 and detector.infer_ms > 0:
+			last_schedule = now
+			frames_per_inference = math.ceil(detector.infer_ms * args.target_fps / 1000)
+			if any(s.children_in_danger for s in streams):
+				frames_per_inference //= 2
+			process_every_n_frames = min(args.skip_frames, max(1, frames_per_inference))
 	
 		# Calculate and display FPS
-		fps_frame_count += 1
-		if fps_frame_count >= 30:
-			fps_end_time = time.time()
-			fps_display = fps_frame_count / (fps_end_time - fps_start_time)
-			fps_start_time = fps_end_time
-			fps_frame_count = 0
+		if len(frame_stamps) > 1:
+			fps_display = (len(frame_stamps) - 1) * 1e9 / (frame_stamps[-1] - frame_stamps[0])
 
 		# Upload to Firebase on status change or every N frames
 		frame_counter += 1
@@ -403,73 +578,79 @@ def main():
 			status_data = {
 				"status": global_status,
 				"timestamp": time.time(),
-				"children_count": len(children),
-				"adults_count": len(adults),
-				"children_in_danger": len(children_in_danger)
+				"children_count": sum(len(s.children) for s in streams),
+				"adults_count": sum(len(s.adults) for s in streams),
+				"children_in_danger": sum(len(s.children_in_danger) for s in streams)
 			}
 			firebase.update_status(global_status, status_data)
 			prev_status = global_status
 			frame_counter = 0
 
-		# Show global status banner with flashing effect for danger
-		if global_status == "safe":
-			banner_color = (0, 200, 0)
-			status_text = "✓ SAFE"
-		elif global_status == "warning":
-			banner_color = (0, 255, 255)
-			status_text = "⚠ WARNING"
-		else:
-			# Flashing red banner for danger
-			flash_on = (frame_counter % 10) < 5
-			banner_color = (0, 0, 255) if flash_on else (0, 0, 150)
-			status_text = "🚨 DANGER ALERT"
-
-		cv2.rectangle(frame, (0, 0), (w, 40), (0, 0, 0), -1)
-		cv2.putText(
-			frame,
-			status_text,
-			(10, 28),
-			cv2.FONT_HERSHEY_SIMPLEX,
-			0.9,
-			banner_color,
-			2,
-		)
-
-		# Show child count in zone
-		if len(children) > 0:
-			child_info = f"Children: {len(children)}"
-			if children_in_danger:
-				child_info += f" | IN DANGER: {len(children_in_danger)}"
-			cv2.putText(
-				frame,
-				child_info,
-				(10, h - 15),
-				cv2.FONT_HERSHEY_SIMPLEX,
-				0.5,
-				(255, 255, 255),
-				1,
-			)
-
-		# Display FPS
-		if fps_display > 0:
-			cv2.putText(
-				frame,
-				f"FPS: {fps_display:.1f}",
-				(w - 120, 28),
-				cv2.FONT_HERSHEY_SIMPLEX,
-				0.6,
-				(255, 255, 255),
-				2,
-			)
-
+		for stream in streams:
+			# Stale streams keep showing their last annotated frame; headless
+			# runs never draw at all
+			if args.no_display or not stream.fresh:
+				continue
+			frame = stream.frame
+			overlay = stream.overlay
+			h, w = frame.shape[:2]
+			children = stream.children
+			children_in_danger = stream.children_in_danger
+
+			# Show status banner with flashing effect for danger
+			if stream.status == "safe":
+				banner_color = (0, 200, 0)
+				status_text = "✓ SAFE"
+			elif stream.status == "warning":
+				banner_color = (0, 255, 255)
+				status_text = "⚠ WARNING"
+			else:
+				# Flashing red banner for danger
+				flash_on = (frame_counter % 10) < 5
+				banner_color = (0, 0, 255) if flash_on else (0, 0, 150)
+				status_text = "🚨 DANGER ALERT"
+
+			# Black bar over the persons drawn so far, as before; the strip is
+			# rendered once per (text, color) and then copied
+			overlay.banner(40, (0, 0, 0), status_text, (10, 28), 0.9, banner_color, 2)
+
+			# Show child count in zone
+			if len(children) > 0:
+				child_info = f"Children: {len(children)}"
+				if children_in_danger:
+					child_info += f" | IN DANGER: {len(children_in_danger)}"
+				overlay.text(child_info, (10, h - 15), 0.5, (255, 255, 255), 1)
+
+			# Display FPS
+			if fps_display > 0:
+				overlay.text(f"FPS: {fps_display:.1f}", (w - 120, 28), 0.6, (255, 255, 255), 2)
+
+			display.show(stream.window_name, overlay.apply(frame))
+
+		# Detection frames were analysed and shown; their buffers can be reused
+		if result is not None:
+			detector.recycle(result)
+
+		# Pace to absolute deadlines so wait overshoot does not accumulate;
+		# with a window open, the wait doubles as the GUI event pump
+		deadline += frame_period
+		now = time.monotonic_ns()
+		if now - deadline > frame_period:
+			# Fell more than a frame behind: restart the schedule, don't burst
+			deadline = now
 		if not args.no_display:
-			cv2.imshow("SafeEdge Guardian", frame)
-			key = cv2.waitKey(1) & 0xFF
-			if key == ord("q"):
+			if display.poll_key(max(1, (deadline - now) // 1_000_000)) == ord("q"):
 				break
+		else:
+			sleep_until(deadline)
 
-	cap.release()
-	cv2.destroyAllWindows()
+	for stream in streams:
+		stream.cap.release()
+	firebase.close()
+	if isinstance(detector, ProcessDetectorPool):
+		detector.close()
+	if not args.no_display:
+		display.close()
 	print("\nSafeEdge Guardian stopped.")
 
 
@@ -3,6 +3,7 @@ Monitor Firebase updates in real-time
 Shows current device status and alerts from Firebase Realtime Database
 """
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import time
 from datetime import datetime
@@ -18,13 +19,17 @@ with open("scripts/google-services.json", 'r') as f:
 database_url = config["project_info"]["firebase_url"]
 device_id = "MEM001"
 
+# One keep-alive connection reused for every request (no TLS handshake per call)
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+
 prev_status = None
 prev_update = None
 
 while True:
     try:
         # Get device status
-        response = requests.get(f"{database_url}/devices/{device_id}.json", timeout=5)
+        response = session.get(f"{database_url}/devices/{device_id}.json", timeout=5)
         
         if response.status_code == 200:
             data = response.json()
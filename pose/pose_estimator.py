@@ -1,4 +1,5 @@
 import cv2
+import numpy as np
 from mediapipe.python.solutions import pose as mp_pose
 from mediapipe.python.solutions import drawing_utils as mp_drawing
 
@@ -11,9 +12,18 @@ class PoseEstimator:
             min_detection_confidence=0.5,
             min_tracking_confidence=0.5
         )
+        self._rgb_buf = None  # Reused RGB conversion target
+        # Warm-up: the first process() call loads and initializes the graph
+        self.pose.process(np.zeros((256, 256, 3), dtype=np.uint8))
 
     def estimate(self, person_crop):
-        rgb = cv2.cvtColor(person_crop, cv2.COLOR_BGR2RGB)
+        if self._rgb_buf is None or self._rgb_buf.shape != person_crop.shape:
+            self._rgb_buf = np.empty_like(person_crop)
+        rgb = self._rgb_buf
+        rgb.flags.writeable = True
+        cv2.cvtColor(person_crop, cv2.COLOR_BGR2RGB, dst=rgb)
+        # Read-only input lets MediaPipe wrap it without copying
+        rgb.flags.writeable = False
         results = self.pose.process(rgb)
         return results
 
@@ -0,0 +1,58 @@
+"""
+Record frames from the target camera for INT8 engine calibration.
+
+Usage:
+    python scripts/collect_calibration.py --source 0 --frames 500
+    python main.py --int8 --calib-data data/calibration/calib.yaml
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.camera import ThreadedCamera
+
+parser = argparse.ArgumentParser(description="Collect INT8 calibration frames")
+parser.add_argument("--source", type=str, default="0", help="Camera index, video path or URL")
+parser.add_argument("--frames", type=int, default=500, help="Number of frames to record")
+parser.add_argument("--interval", type=float, default=0.2, help="Seconds between saved frames")
+parser.add_argument("--resolution", type=str, default="480x360", help="Frame size WxH")
+parser.add_argument("--out", type=str, default="data/calibration", help="Output folder")
+args = parser.parse_args()
+
+width, height = map(int, args.resolution.split("x"))
+source = int(args.source) if args.source.isdigit() else args.source
+image_dir = os.path.join(args.out, "images")
+os.makedirs(image_dir, exist_ok=True)
+
+cap = ThreadedCamera(source, target_width=width, target_height=height).start()
+time.sleep(2)
+
+saved = 0
+while saved < args.frames and not cap.stopped:
+    if not cap.grab():
+        time.sleep(0.01)
+        continue
+    ret, frame = cap.retrieve()
+    if not ret:
+        continue
+    cv2.imwrite(os.path.join(image_dir, f"{saved:05d}.jpg"), frame)
+    saved += 1
+    if saved % 50 == 0:
+        print(f"📸 {saved}/{args.frames} frames")
+    time.sleep(args.interval)
+cap.release()
+
+# Ultralytics reads calibration images from the dataset's val split
+calib_yaml = os.path.join(args.out, "calib.yaml")
+with open(calib_yaml, "w") as f:
+    f.write(f"path: {os.path.abspath(args.out)}\n")
+    f.write("train: images\n")
+    f.write("val: images\n")
+    f.write("kpt_shape: [17, 3]\n")
+    f.write("names:\n  0: person\n")
+
+print(f"✅ Saved {saved} frames and {calib_yaml}")
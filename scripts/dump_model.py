@@ -0,0 +1,21 @@
+"""
+Dump the trained child/adult logistic regression to a plain .npz array file.
+
+RoleClassifier loads the .npz when present, so runtime no longer needs
+joblib/sklearn. Re-run after scripts/train_classifier.py.
+"""
+import joblib
+import numpy as np
+
+model = joblib.load("classifiers/trained_model/child_adult_model.pkl")
+
+if getattr(model, "coef_", None) is None or model.coef_.shape != (1, 2):
+    raise SystemExit("❌ Only a 2-feature binary linear model can be dumped")
+
+np.savez(
+    "classifiers/trained_model/child_adult_model.npz",
+    coef=model.coef_[0].astype(np.float64),
+    intercept=np.float64(model.intercept_[0]),
+    classes=np.asarray(model.classes_),
+)
+print("✅ Model arrays saved to classifiers/trained_model/child_adult_model.npz")
@@ -2,11 +2,16 @@
 Test Firebase connectivity and diagnose issues
 """
 import requests
+from requests.adapters import HTTPAdapter
 import json
 from datetime import datetime
 
 print("🔥 Firebase Connection Test\n")
 
+# One keep-alive connection reused for every request (no TLS handshake per call)
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+
 # Load config
 try:
     with open("scripts/google-services.json", 'r') as f:
@@ -35,7 +40,7 @@ test_data = {
 }
 
 try:
-    response = requests.patch(url_no_auth, json=test_data, timeout=5)
+    response = session.patch(url_no_auth, json=test_data, timeout=5)
     print(f"   Response: {response.status_code}")
     if response.status_code == 200:
         print(f"   ✅ Write successful (no auth needed)")
@@ -52,7 +57,7 @@ print("Test 2: Writing with auth...")
 url_with_auth = f"{database_url}/devices/{device_id}.json?auth={api_key}"
 
 try:
-    response = requests.patch(url_with_auth, json=test_data, timeout=5)
+    response = session.patch(url_with_auth, json=test_data, timeout=5)
     print(f"   Response: {response.status_code}")
     if response.status_code == 200:
         print(f"   ✅ Write successful (with auth)")
@@ -67,7 +72,7 @@ print()
 # Test 3: Read from Firebase
 print("Test 3: Reading data...")
 try:
-    response = requests.get(f"{database_url}/devices/{device_id}.json", timeout=5)
+    response = session.get(f"{database_url}/devices/{device_id}.json", timeout=5)
     print(f"   Response: {response.status_code}")
     if response.status_code == 200:
         data = response.json()
@@ -5,6 +5,7 @@ Tests IP camera stream for stability, lag, and reconnection behavior
 import argparse
 import cv2
 import time
+from collections import deque
 from utils.camera import ThreadedCamera
 
 def test_stream_stability(source, duration=300, show_video=True):
@@ -41,7 +42,12 @@ def test_stream_stability(source, duration=300, show_video=True):
     
     frame_count = 0
     failed_reads = 0
-    fps_samples = []
+    recent_fps = deque(maxlen=10)  # Last 10 one-second samples
+    recent_sum = 0.0
+    fps_total = 0.0  # All-time running statistics
+    fps_count = 0
+    min_fps = float("inf")
+    max_fps = 0.0
     last_fps_time = time.time()
     fps_frame_count = 0
     
@@ -66,7 +72,14 @@ def test_stream_stability(source, duration=300, show_video=True):
                 # Calculate FPS every second
                 if current_time - last_fps_time >= 1.0:
                     fps = fps_frame_count / (current_time - last_fps_time)
-                    fps_samples.append(fps)
+                    if len(recent_fps) == recent_fps.maxlen:
+                        recent_sum -= recent_fps[0]
+                    recent_fps.append(fps)
+                    recent_sum += fps
+                    fps_total += fps
+                    fps_count += 1
+                    min_fps = min(min_fps, fps)
+                    max_fps = max(max_fps, fps)
                     last_fps_time = current_time
                     fps_frame_count = 0
                 
@@ -76,7 +89,7 @@ def test_stream_stability(source, duration=300, show_video=True):
                     health_checks.append(health)
                     
                     # Progress update
-                    avg_fps = sum(fps_samples[-10:]) / len(fps_samples[-10:]) if fps_samples else 0
+                    avg_fps = recent_sum / len(recent_fps) if recent_fps else 0
                     print(f"[{elapsed:.0f}s / {duration}s] "
                           f"Frames: {frame_count}, "
                           f"FPS: {avg_fps:.1f}, "
@@ -122,10 +135,8 @@ def test_stream_stability(source, duration=300, show_video=True):
         print(f"Failed Reads: {failed_reads}")
         print(f"Success Rate: {(frame_count/(frame_count+failed_reads)*100) if frame_count+failed_reads > 0 else 0:.1f}%")
         
-        if fps_samples:
-            avg_fps = sum(fps_samples) / len(fps_samples)
-            min_fps = min(fps_samples)
-            max_fps = max(fps_samples)
+        if fps_count:
+            avg_fps = fps_total / fps_count
             print(f"\nFPS Statistics:")
             print(f"  Average: {avg_fps:.1f}")
             print(f"  Min: {min_fps:.1f}")
@@ -142,10 +153,10 @@ def test_stream_stability(source, duration=300, show_video=True):
         
         # Verdict
         print("\n" + "=" * 60)
-        if failed_reads < frame_count * 0.05 and fps_samples and avg_fps > 8:
+        if failed_reads < frame_count * 0.05 and fps_count and avg_fps > 8:
             print("✅ VERDICT: Stream is STABLE")
             print("   Ready for production use")
-        elif failed_reads < frame_count * 0.15 and fps_samples and avg_fps > 5:
+        elif failed_reads < frame_count * 0.15 and fps_count and avg_fps > 5:
             print("⚠️  VERDICT: Stream is ACCEPTABLE")
             print("   May have occasional issues")
         else:
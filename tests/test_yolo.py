@@ -1,4 +1,5 @@
 import cv2
+import numpy as np
 from detectors.yolo_person_detector import YOLOPersonDetector
 from features.feature_extractor import FeatureExtractor
 from classifiers.role_classifier import RoleClassifier
@@ -8,7 +9,9 @@ from utils.dataset_logger import DatasetLogger
 
 def main():
     cap = cv2.VideoCapture(0)
-    detector = YOLOPersonDetector()
+    # Inference runs on the detector's own thread: capture, detection and
+    # drawing overlap instead of running back to back
+    detector = YOLOPersonDetector().start_async()
     extractor = FeatureExtractor()
     classifier = RoleClassifier()
     supervisor = SupervisionChecker()
@@ -24,6 +27,16 @@ def main():
         if not ret:
             break
 
+        # Latest frame wins: a frame the detector has not picked up is replaced
+        detector.submit([frame], [0])
+        result = detector.next_result()
+        if result is None:
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+            continue
+        # Draw on the frame the detections belong to
+        _, frame, persons = result[0]
+
         h, w, _ = frame.shape
         if danger_zone is None:
             danger_zone = DangerZone(w, h)
@@ -34,8 +47,6 @@ def main():
         cv2.putText(frame, "DANGER ZONE", (zx1 + 5, 30),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
 
-        persons = detector.detect(frame)
-
         children = []
         adults = []
 
@@ -66,31 +77,15 @@ def main():
 
         status = "SAFE"
 
-        for cid, cpos in children:
-            in_danger = danger_zone.is_inside(int(cpos[0]), int(cpos[1]))
-
-            if not in_danger:
-                continue
-
-            attentive = False
-            has_adult = False
-            for aid, apos in adults:
-                has_adult = True
-                if supervisor.is_attentive(aid, apos, cpos):
-                    attentive = True
-                    break
-
-            if not attentive:
-                if not has_adult:
-                    status = "DANGER"
-                else:
-                    status = "WARNING"
-            else:
-                if status == "SAFE":
-                    status = "WARNING"
-
-            if status == "DANGER":
-                break
+        child_xy = np.asarray([c[1] for c in children], np.float32).reshape(-1, 2)
+        in_danger = danger_zone.mask(child_xy.astype(np.int32))
+        if in_danger.any():
+            # A child in the zone is at least a WARNING, even when attended;
+            # the check still runs to keep the adults' motion history current
+            adult_xy = np.asarray([a[1] for a in adults], np.float32).reshape(-1, 2)
+            supervisor.attentive_matrix(
+                [a[0] for a in adults], adult_xy, child_xy[in_danger])
+            status = "WARNING" if adults else "DANGER"
 
         # Display global status
         if status == "SAFE":
@@ -109,6 +104,7 @@ def main():
                     3)
 
         cv2.imshow("SafeEdge Guardian — Phase 7", frame)
+        detector.recycle(result)
 
         if cv2.waitKey(1) & 0xFF == ord('q'):
             break
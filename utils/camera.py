@@ -1,15 +1,43 @@
 import cv2
+import numpy as np
+import os
 import threading
 import time
 
+# OpenCV wheels from PyPI ship without GStreamer; distro/Jetson builds have it
+HAS_GSTREAMER = "GStreamer:                   YES" in cv2.getBuildInformation()
+# Hardware decode request for the FFMPEG backend (OpenCV >= 4.5.2)
+HAS_HW_DECODE = hasattr(cv2, "VIDEO_ACCELERATION_ANY")
+
+# Uncompressed 4:2:2 from local cameras: no JPEG decode per frame
+FOURCC_YUYV = cv2.VideoWriter_fourcc(*"YUYV")
+# Largest frame requested as YUYV; bigger ones need MJPG to keep FPS over USB 2
+YUYV_MAX_PIXELS = 640 * 480
+
+# A grab() this fast was served from the buffer, not waited for
+BUFFERED_GRAB_S = 0.005
+# Upper bound on buffered frames skipped before one decode
+MAX_DRAIN_GRABS = 8
+
 
 class ThreadedCamera:
     """
     Threaded camera capture for stable FPS with automatic reconnection.
     Optimized for long-running IP camera streams.
+
+    Only the background thread touches the VideoCapture: it grabs every
+    frame to keep the stream drained, but decodes only when asked. Each
+    retrieve() requests one decode of the next grabbed frame, so frames
+    nobody asked for (skipped or throttled ones) are never decoded.
+    retrieve() just takes the newest decoded buffer and never waits on
+    the blocking grab(); right after an idle period it returns nothing
+    and the requested frame is ready about one frame interval later.
+    Decoding rotates through four pre-allocated buffers, skipping the two
+    the consumer may still hold, so a returned frame stays valid until
+    the next-but-one retrieve().
     """
 
-    def __init__(self, src, buffer_size=1, timeout=10, target_width=480, target_height=360):
+    def __init__(self, src, buffer_size=1, timeout=10, target_width=480, target_height=360, cpu=None):
         """
         Args:
             src: Video source (int for camera, str for video/stream)
@@ -17,34 +45,93 @@ class ThreadedCamera:
             timeout: Stream timeout in seconds
             target_width: Resize width for lower resolution
             target_height: Resize height for lower resolution
+            cpu: Core to pin the capture thread to (Linux only), or None
         """
         self.src = src
         self.target_width = target_width
         self.target_height = target_height
         self.timeout = timeout
+        self.cpu = cpu
         
         # Stream health monitoring (MUST be set BEFORE _init_capture)
-        self.is_stream = isinstance(src, str) and src.startswith('http')
+        self.is_stream = isinstance(src, str) and src.startswith(('http', 'rtsp'))
+        self.is_file = isinstance(src, str) and os.path.isfile(src)
         self.refresh_interval = 300  # Refresh stream every 5 minutes for IP cameras
-        self.last_refresh = time.time()
+        self.last_refresh = time.monotonic()
+        self.warned_at = {}  # Warning kind -> [last printed time, suppressed count]
         
         # Initialize capture
         self.cap = self._init_capture()
         
-        self.frame = None
-        self.grabbed = False
-        self.lock = threading.Lock()
+        self.grabbed = False  # A grabbed frame is waiting to be retrieved
+        
+        # Output buffers at target size: the two last handed to the consumer,
+        # one decoded and waiting, one being written. Plus a decode buffer
+        # that is only used when the source delivers a different size.
+        self.frames = [np.empty((target_height, target_width, 3), np.uint8) for _ in range(4)]
+        self.ready_slot = None  # Newest decoded frame not yet retrieved
+        self.held_slots = (None, None)  # Returned by the last two retrieve() calls
+        self.decode_buf = None
+        self.decode_requested = True  # One-shot: decode the next grab (first frame too)
+        self.lock = threading.Lock()  # Guards the slot bookkeeping, held only briefly
+        self.cap_lock = threading.Lock()  # Serializes capture thread and release() on self.cap
         self.stopped = False
-        self.last_frame_time = time.time()
-        self.last_successful_read = time.time()
+        self.last_frame_time = time.monotonic()
+        self.last_successful_read = time.monotonic()
         self.reconnect_attempts = 0
         self.max_reconnect_attempts = 5
         self.frame_count = 0
         self.stale_frame_threshold = 5.0  # Seconds before considering stream stale
     
+    def _warn(self, kind, message, *args):
+        """
+        Print a repeating warning at most once per second per kind, with a
+        count of the ones suppressed meanwhile. The message is only
+        formatted when it is actually printed.
+        """
+        now = time.monotonic()
+        entry = self.warned_at.setdefault(kind, [-1.0, 0])
+        if now - entry[0] < 1.0:
+            entry[1] += 1
+            return
+        suffix = f" (+{entry[1]} more)" if entry[1] else ""
+        entry[0], entry[1] = now, 0
+        print(message.format(*args) + suffix)
+
+    def _gstreamer_pipeline(self):
+        """
+        Decode and scale a network stream inside GStreamer; appsink keeps only
+        the newest buffer, so grab() never queues up stale frames.
+        decodebin picks the highest-ranked decoder, which is the hardware one
+        (nvv4l2decoder/nvjpegdec on Jetson, VA-API, ...) when it is installed.
+        Sources are spelled out rather than left to uridecodebin, which
+        buffers HTTP downloads and keeps rtspsrc's 2 s jitterbuffer default.
+        """
+        if self.src.startswith("rtsp"):
+            source = f"rtspsrc location={self.src} latency=0"
+        else:
+            source = f"souphttpsrc location={self.src} is-live=true do-timestamp=true"
+        return (
+            f"{source} ! decodebin ! videoconvert ! videoscale "
+            f"! video/x-raw,format=BGR,width={self.target_width},height={self.target_height} "
+            "! appsink name=sink sync=false drop=true max-buffers=1"
+        )
+
     def _init_capture(self):
         """Initialize video capture with optimal settings."""
-        cap = cv2.VideoCapture(self.src)
+        if self.is_stream and HAS_GSTREAMER:
+            cap = cv2.VideoCapture(self._gstreamer_pipeline(), cv2.CAP_GSTREAMER)
+            if cap.isOpened():
+                return cap
+            cap.release()
+            print("⚠️  GStreamer pipeline failed to open; falling back to FFMPEG")
+
+        if self.is_stream and HAS_HW_DECODE:
+            # Let FFMPEG decode on NVDEC/VA-API/D3D11 when available (CPU otherwise)
+            cap = cv2.VideoCapture(self.src, cv2.CAP_FFMPEG,
+                                   [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY])
+        else:
+            cap = cv2.VideoCapture(self.src)
         
         # Aggressive optimization for network streams
         cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Minimal buffer
@@ -56,9 +143,16 @@ class ThreadedCamera:
         cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.target_height)
         cap.set(cv2.CAP_PROP_FPS, 10)
         
-        # For IP cameras, use FFMPEG backend if available for better streaming
-        if self.is_stream:
-            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc('M','J','P','G'))
+        # Local cameras: raw YUYV turns into BGR with one cheap conversion,
+        # while MJPG would need a full JPEG decode on the CPU every frame.
+        # (Network streams arrive already encoded; FOURCC does not apply.)
+        if not self.is_stream and not self.is_file and \
+                self.target_width * self.target_height <= YUYV_MAX_PIXELS:
+            cap.set(cv2.CAP_PROP_FOURCC, FOURCC_YUYV)
+            fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+            if fourcc != FOURCC_YUYV:
+                name = fourcc.to_bytes(4, "little").decode("ascii", "replace").strip("\x00") or "unknown"
+                self._warn("fourcc", "⚠️ Camera did not accept YUYV; capturing as {}", name)
         
         return cap
 
@@ -70,10 +164,12 @@ class ThreadedCamera:
     def _refresh_stream(self):
         """Refresh the stream connection to prevent long-term degradation."""
         print("🔄 Refreshing stream connection...")
-        self.cap.release()
+        with self.cap_lock:
+            self.cap.release()
         time.sleep(0.5)
-        self.cap = self._init_capture()
-        self.last_refresh = time.time()
+        with self.cap_lock:
+            self.cap = self._init_capture()
+        self.last_refresh = time.monotonic()
         self.reconnect_attempts = 0
         print("✅ Stream refreshed")
     
@@ -85,9 +181,11 @@ class ThreadedCamera:
             return False
         
         print(f"🔄 Reconnecting to stream... (attempt {self.reconnect_attempts + 1}/{self.max_reconnect_attempts})")
-        self.cap.release()
+        with self.cap_lock:
+            self.cap.release()
         time.sleep(2)  # Wait before reconnecting
-        self.cap = self._init_capture()
+        with self.cap_lock:
+            self.cap = self._init_capture()
         self.reconnect_attempts += 1
         
         if self.cap.isOpened():
@@ -96,13 +194,17 @@ class ThreadedCamera:
         return False
 
     def _update(self):
-        """Background thread that continuously reads frames with health monitoring."""
+        """Background thread that continuously grabs frames with health monitoring."""
         consecutive_failures = 0
         max_consecutive_failures = 30
+
+        # Keep stream reading on its own core, off the inference cores
+        if self.cpu is not None and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, {self.cpu})
         
         while not self.stopped:
             # Periodic stream refresh for IP cameras (prevent long-term degradation)
-            if self.is_stream and (time.time() - self.last_refresh) > self.refresh_interval:
+            if self.is_stream and (time.monotonic() - self.last_refresh) > self.refresh_interval:
                 self._refresh_stream()
             
             # Check if stream is opened
@@ -111,87 +213,146 @@ class ThreadedCamera:
                     break
                 continue
 
-            # Try to read frame
+            # Always grab; decode only when retrieve() asked for a frame
             try:
-                grabbed, frame = self.cap.read()
+                with self.cap_lock:
+                    t0 = time.monotonic()
+                    grabbed = self.cap.grab()
+                    drained = 0
+                    slot = None
+                    if grabbed and self._take_request():
+                        # Skip buffered frames so the decode goes to the freshest one
+                        while (not self.is_file and drained < MAX_DRAIN_GRABS
+                               and time.monotonic() - t0 < BUFFERED_GRAB_S):
+                            t0 = time.monotonic()
+                            if not self.cap.grab():
+                                break
+                            drained += 1
+                        slot = self._decode()
+                        if slot is None:
+                            self.decode_requested = True  # Failed: try the next grab
+                with self.lock:
+                    if grabbed:
+                        self.grabbed = True
+                        self.last_frame_time = time.monotonic()
+                        self.last_successful_read = self.last_frame_time
+                        self.frame_count += 1 + drained
+                        # An undecoded grab makes any waiting frame outdated
+                        self.ready_slot = slot
             except Exception as e:
-                print(f"⚠️ Frame capture error: {e}")
+                self._warn("capture", "⚠️ Frame capture error: {}", e)
                 grabbed = False
-                frame = None
             
-            if grabbed and frame is not None and frame.size > 0:
-                try:
-                    # Resize frame to target resolution
-                    if frame.shape[1] != self.target_width or frame.shape[0] != self.target_height:
-                        frame = cv2.resize(frame, (self.target_width, self.target_height), 
-                                         interpolation=cv2.INTER_LINEAR)
-                    
-                    # Update frame with lock
-                    with self.lock:
-                        # Free old frame memory
-                        if self.frame is not None:
-                            del self.frame
-                        self.frame = frame
-                        self.grabbed = True
-                        self.last_frame_time = time.time()
-                        self.last_successful_read = time.time()
-                        self.frame_count += 1
-                    
-                    # Reset counters on success
-                    self.reconnect_attempts = 0
-                    consecutive_failures = 0
-                    
-                    # Small delay to prevent CPU overload
-                    time.sleep(0.03)  # ~30 FPS max
-                    
-                    # Clear any buffered frames for IP cameras (reduce lag)
-                    if self.is_stream and self.frame_count % 10 == 0:
-                        # Grab and discard pending frames to clear buffer
-                        for _ in range(3):
-                            self.cap.grab()
-                    
-                except Exception as e:
-                    print(f"⚠️ Frame processing error: {e}")
-                    consecutive_failures += 1
-                    time.sleep(0.05)
+            if grabbed:
+                # Reset counters on success
+                self.reconnect_attempts = 0
+                consecutive_failures = 0
+                
+                # Live sources block in grab() until the next frame arrives,
+                # so draining needs no extra delay; files are paced to ~30 FPS
+                if self.is_file:
+                    time.sleep(0.03)
             else:
-                # Frame read failed
+                # Frame grab failed
                 consecutive_failures += 1
                 
                 # Check for stale stream
-                time_since_success = time.time() - self.last_successful_read
+                time_since_success = time.monotonic() - self.last_successful_read
                 if time_since_success > self.stale_frame_threshold:
-                    print(f"⚠️ Stream stale ({time_since_success:.1f}s since last frame)")
+                    self._warn("stale", "⚠️ Stream stale ({:.1f}s since last frame)", time_since_success)
                     if not self._reconnect():
                         break
                 
                 # Too many consecutive failures - try reconnect
                 if consecutive_failures >= max_consecutive_failures:
-                    print(f"⚠️ Too many frame failures ({consecutive_failures})")
+                    self._warn("failures", "⚠️ Too many frame failures ({})", consecutive_failures)
                     consecutive_failures = 0
                     if not self._reconnect():
                         break
                 
                 time.sleep(0.1)  # Longer delay on failure
 
-    def read(self):
-        """Read the latest frame (non-blocking, thread-safe)."""
+    def grab(self):
+        """Return True if a new frame was grabbed since the last retrieve() (non-blocking)."""
         with self.lock:
-            if self.frame is None or self.frame.size == 0:
-                return False, None
-            try:
-                # Return a copy to prevent external modifications
-                return self.grabbed, self.frame.copy()
-            except Exception as e:
-                print(f"⚠️ Frame read error: {e}")
+            return self.grabbed
+
+    def _take_request(self):
+        """Consume a pending decode request (capture thread)."""
+        with self.lock:
+            requested = self.decode_requested
+            self.decode_requested = False
+        return requested
+
+    def _decode(self):
+        """
+        Decode the grabbed frame into a buffer the consumer does not hold
+        (capture thread, under cap_lock). Returns the slot index or None.
+        """
+        with self.lock:
+            busy = (self.ready_slot,) + self.held_slots
+        index = next(i for i in range(len(self.frames)) if i not in busy)
+        slot = self.frames[index]
+        dst = self.decode_buf if self.decode_buf is not None else slot
+        try:
+            ret, frame = self.cap.retrieve(dst)
+        except Exception as e:
+            self._warn("read", "⚠️ Frame read error: {}", e)
+            return None
+
+        if not ret or frame is None or frame.size == 0:
+            return None
+
+        # OpenCV decodes in place when the size matches; otherwise keep its
+        # buffer for the next decode and resize into the slot
+        if frame is not slot:
+            self.decode_buf = frame
+            # Area averaging when shrinking (no aliasing), bilinear when enlarging
+            shrinking = frame.shape[1] > self.target_width
+            cv2.resize(frame, (self.target_width, self.target_height), dst=slot,
+                       interpolation=cv2.INTER_AREA if shrinking else cv2.INTER_LINEAR)
+        return index
+
+    def retrieve(self):
+        """
+        Return the most recently decoded frame without copying (thread-safe,
+        never blocks on the camera). Returns (False, None) when no new frame
+        has been decoded. Every call requests exactly one decode, of the
+        next grabbed frame, for the following retrieve().
+        """
+        with self.lock:
+            self.decode_requested = True
+            self.grabbed = False
+            index = self.ready_slot
+            if index is None:
                 return False, None
+            self.ready_slot = None
+            self.held_slots = (self.held_slots[1], index)
+        return True, self.frames[index]
+
+    def read(self):
+        """
+        Read the latest frame (grab is done by the background thread): a new
+        one if it has been decoded, else the previous one again, so polling
+        faster than the camera delivers is not a failure.
+        No copy is made: the frame is overwritten by the next-but-one read(),
+        so callers that keep frames longer must copy them.
+        """
+        ret, frame = self.retrieve()
+        if ret:
+            return ret, frame
+        with self.lock:
+            index = self.held_slots[1]
+        if index is None:
+            return False, None
+        return True, self.frames[index]
 
     def isOpened(self):
         """Check if camera is opened and receiving frames."""
         if not self.cap.isOpened():
             return False
         # Also check if we're receiving recent frames
-        time_since_frame = time.time() - self.last_successful_read
+        time_since_frame = time.monotonic() - self.last_successful_read
         return time_since_frame < self.stale_frame_threshold
 
     def release(self):
@@ -200,16 +361,12 @@ class ThreadedCamera:
         self.stopped = True
         time.sleep(0.2)  # Allow thread to finish
         if self.cap is not None:
-            self.cap.release()
-        # Clear frame memory
-        with self.lock:
-            if self.frame is not None:
-                del self.frame
-                self.frame = None
+            with self.cap_lock:
+                self.cap.release()
 
     def get_fps(self):
         """Get estimated FPS based on frame read timing."""
-        current_time = time.time()
+        current_time = time.monotonic()
         time_diff = current_time - self.last_frame_time
         if time_diff > 0:
             return 1.0 / time_diff
@@ -217,7 +374,7 @@ class ThreadedCamera:
     
     def get_stream_health(self):
         """Get stream health metrics."""
-        time_since_frame = time.time() - self.last_successful_read
+        time_since_frame = time.monotonic() - self.last_successful_read
         return {
             "is_healthy": time_since_frame < self.stale_frame_threshold,
             "seconds_since_frame": round(time_since_frame, 2),
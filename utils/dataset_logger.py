@@ -1,10 +1,21 @@
+import atexit
 import csv
 import os
+import queue
+import threading
 import time
 
 class DatasetLogger:
-    def __init__(self, filepath="data/features/pose_features.csv"):
+    """
+    Appends pose feature samples to a CSV file. log() only enqueues the row;
+    a background thread owns the file, so the detection loop never waits
+    on disk.
+    """
+
+    def __init__(self, filepath="data/features/pose_features.csv", flush_every=256, flush_interval=5.0):
         self.filepath = filepath
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval  # Seconds; bounds data lost on a crash
         self.header = [
             "timestamp",
             "person_id",
@@ -12,22 +23,65 @@ class DatasetLogger:
             "shoulder_body_ratio",
             "role"
         ]
+        self.dropped = 0  # Rows discarded because the writer fell behind
 
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
 
         # Write header ONLY once
-        if not os.path.exists(filepath):
-            with open(filepath, "w", newline="") as f:
-                writer = csv.writer(f)
-                writer.writerow(self.header)
+        write_header = not os.path.exists(filepath)
+
+        # One long-lived handle: rows land in a 64 KiB user-space buffer and
+        # reach the OS only on flush, not one open/write/close per sample
+        self.file = open(filepath, "a", newline="", buffering=1 << 16)
+        self.writer = csv.writer(self.file)
+        if write_header:
+            self.writer.writerow(self.header)
+
+        self.queue = queue.Queue(maxsize=4096)
+        self.thread = threading.Thread(target=self._worker, daemon=True)
+        self.thread.start()
+
+        # Don't lose the tail of the queue on exit
+        atexit.register(self.close)
 
     def log(self, person_id, features, role):
-        with open(self.filepath, "a", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                time.time(),
-                person_id,
-                features["body_height"],
-                features["shoulder_body_ratio"],
-                role
-            ])
+        row = [
+            time.time(),
+            person_id,
+            features["body_height"],
+            features["shoulder_body_ratio"],
+            role
+        ]
+        try:
+            self.queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        """Write everything still queued, then close the file."""
+        if not self.thread.is_alive():
+            return
+        self.queue.put(None)
+        self.thread.join()
+        if self.dropped:
+            print(f"⚠️ Dataset logger dropped {self.dropped} samples")
+
+    def _worker(self):
+        pending = 0
+        last_flush = time.monotonic()
+        while True:
+            try:
+                row = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                row = False  # Idle: fall through to the time-based flush
+            if row is None:
+                break
+            if row:
+                self.writer.writerow(row)
+                pending += 1
+            now = time.monotonic()
+            if pending and (pending >= self.flush_every or now - last_flush >= self.flush_interval):
+                self.file.flush()
+                pending = 0
+                last_flush = now
+        self.file.close()
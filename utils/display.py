@@ -0,0 +1,125 @@
+import time
+
+import cv2
+
+from utils.camera import HAS_GSTREAMER
+
+try:
+    import pygame
+    HAS_PYGAME = True
+except ImportError:
+    HAS_PYGAME = False
+
+
+class OpenCVDisplay:
+    """HighGUI windows (cv2.imshow); 'q' in any window quits."""
+
+    def __init__(self):
+        self.has_window = False
+
+    def show(self, window_name, frame):
+        cv2.imshow(window_name, frame)
+        self.has_window = True
+
+    def poll_key(self, wait_ms=1):
+        """
+        Pump window events for up to wait_ms (doubles as the loop's frame
+        pacing); return the pressed key code or -1.
+        """
+        if not self.has_window:
+            # waitKey() returns at once while no window exists
+            time.sleep(wait_ms / 1000)
+            return -1
+        key = cv2.waitKey(wait_ms)
+        return key & 0xFF if key >= 0 else -1
+
+    def close(self):
+        cv2.destroyAllWindows()
+
+
+class GStreamerDisplay:
+    """
+    Push frames into an appsrc ! autovideosink pipeline per window.
+
+    The sink renders asynchronously (sync=false), so the main loop does not
+    wait on a HighGUI blit or a waitKey() event pump. There is no keyboard
+    handling; stop with Ctrl+C.
+    """
+
+    def __init__(self, fps=10):
+        self.fps = fps
+        self.writers = {}
+
+    def show(self, window_name, frame):
+        writer = self.writers.get(window_name)
+        if writer is None:
+            h, w = frame.shape[:2]
+            pipeline = (
+                "appsrc is-live=true do-timestamp=true format=time "
+                f"caps=video/x-raw,format=BGR,width={w},height={h},framerate={self.fps}/1 "
+                "! queue max-size-buffers=1 leaky=downstream "
+                "! videoconvert ! autovideosink sync=false"
+            )
+            writer = cv2.VideoWriter(pipeline, cv2.CAP_GSTREAMER, 0, self.fps, (w, h))
+            self.writers[window_name] = writer
+        writer.write(frame)
+
+    def poll_key(self, wait_ms=1):
+        time.sleep(wait_ms / 1000)
+        return -1
+
+    def close(self):
+        for writer in self.writers.values():
+            writer.release()
+        self.writers.clear()
+
+
+class PygameDisplay:
+    """
+    One SDL window; each stream gets its own tile, side by side. Frames are
+    wrapped as BGR surfaces without copying and blitted straight to the
+    window, skipping HighGUI's per-frame copy and event loop.
+    """
+
+    def __init__(self, num_windows=1):
+        pygame.init()
+        self.num_windows = num_windows
+        self.tiles = {}  # window name -> x offset
+        self.screen = None
+
+    def show(self, window_name, frame):
+        h, w = frame.shape[:2]
+        if self.screen is None:
+            self.screen = pygame.display.set_mode((w * self.num_windows, h))
+            pygame.display.set_caption("SafeEdge Guardian")
+        x = self.tiles.setdefault(window_name, len(self.tiles) * w)
+        surface = pygame.image.frombuffer(frame.data, (w, h), "BGR")
+        self.screen.blit(surface, (x, 0))
+        pygame.display.update((x, 0, w, h))
+
+    def poll_key(self, wait_ms=1):
+        """Handle SDL events, then wait; window close or 'q' report as 'q'."""
+        key = -1
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                key = ord("q")
+            elif event.type == pygame.KEYDOWN and event.key < 256:
+                key = event.key
+        time.sleep(wait_ms / 1000)
+        return key
+
+    def close(self):
+        pygame.quit()
+
+
+def create_display(backend="opencv", fps=10, num_windows=1):
+    """Return a display for the requested backend, falling back to OpenCV."""
+    if backend == "gstreamer":
+        if HAS_GSTREAMER:
+            return GStreamerDisplay(fps)
+        print("⚠️  OpenCV was built without GStreamer; using OpenCV windows")
+    elif backend == "pygame":
+        if HAS_PYGAME:
+            return PygameDisplay(num_windows)
+        print("⚠️  pygame is not installed; using OpenCV windows")
+    return OpenCVDisplay()
@@ -0,0 +1,127 @@
+import cv2
+import numpy as np
+
+
+class Overlay:
+    """
+    Deferred drawing for one frame: rect() and text() only record the
+    primitive, apply() draws everything in a single pass, in call order
+    (later primitives cover earlier ones, as with direct drawing). Frames
+    that are never shown (headless mode) skip the drawing cost entirely.
+
+    Static primitives (add_static_*) survive clear(); they are rendered
+    once and pasted onto every frame by pixel index instead of redrawn.
+    A banner (filled top strip + text) is rendered once per text/color and
+    copied in at its place in the call order.
+    Per-frame text is rasterized once per (text, scale, thickness) into a
+    pixel-offset sprite; repeated labels are pasted instead of redrawn.
+    """
+
+    SPRITE_CACHE_SIZE = 512
+
+    def __init__(self):
+        self.ops = []  # ("rect", pt1, pt2, color, thickness) / ("text", text, org, scale, color, thickness)
+        self.static_ops = []  # Same records as ops
+        self._static = None  # (frame shape, flat pixel indices, BGR values)
+        self._banners = {}  # (banner args, frame width) -> rendered (height, W, 3) strip
+        self._sprites = {}  # (text, scale, thickness) -> (dy, dx) offsets of drawn pixels
+
+    def clear(self):
+        """Drop the per-frame primitives; static ones are kept."""
+        self.ops.clear()
+
+    def rect(self, pt1, pt2, color, thickness):
+        self.ops.append(("rect", pt1, pt2, color, thickness))
+
+    def text(self, text, org, scale, color, thickness):
+        self.ops.append(("text", text, org, scale, color, thickness))
+
+    def banner(self, height, fill, text, org, scale, color, thickness):
+        """
+        The top `height` rows filled with `fill`, with text on them. The strip
+        covers everything drawn before it and is copied in, not redrawn.
+        """
+        self.ops.append(("banner", height, fill, text, org, scale, color, thickness))
+
+    def add_static_rect(self, pt1, pt2, color, thickness):
+        self.static_ops.append(("rect", pt1, pt2, color, thickness))
+        self._static = None
+
+    def add_static_text(self, text, org, scale, color, thickness):
+        self.static_ops.append(("text", text, org, scale, color, thickness))
+        self._static = None
+
+    @staticmethod
+    def _draw(frame, ops):
+        """Draw rect/text records directly with OpenCV, in order."""
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        for op in ops:
+            if op[0] == "rect":
+                cv2.rectangle(frame, *op[1:])
+            else:
+                text, org, scale, color, thickness = op[1:]
+                cv2.putText(frame, text, org, font, scale, color, thickness)
+
+    def _sprite(self, text, scale, thickness):
+        key = (text, scale, thickness)
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            # putText without anti-aliasing is single-color, so the glyph
+            # pixels relative to the text origin fully describe it
+            font = cv2.FONT_HERSHEY_SIMPLEX
+            (w, h), baseline = cv2.getTextSize(text, font, scale, thickness)
+            pad = thickness + 1
+            canvas = np.zeros((h + baseline + 2 * pad, w + 2 * pad), dtype=np.uint8)
+            cv2.putText(canvas, text, (pad, h + pad), font, scale, 255, thickness)
+            dy, dx = np.nonzero(canvas)
+            sprite = (dy - (h + pad), dx - pad)
+            if len(self._sprites) >= self.SPRITE_CACHE_SIZE:
+                self._sprites.clear()
+            self._sprites[key] = sprite
+        return sprite
+
+    def _paste_text(self, frame, text, org, scale, color, thickness):
+        height, width = frame.shape[:2]
+        dy, dx = self._sprite(text, scale, thickness)
+        ys = dy + org[1]
+        xs = dx + org[0]
+        keep = (ys >= 0) & (ys < height) & (xs >= 0) & (xs < width)
+        frame[ys[keep], xs[keep]] = color
+
+    def _render_static(self, shape):
+        # Draw onto a black and a white canvas: pixels that end up equal on
+        # both were painted (works for black fills too)
+        layers = []
+        for fill in (0, 255):
+            canvas = np.full(shape, fill, dtype=np.uint8)
+            self._draw(canvas, self.static_ops)
+            layers.append(canvas.reshape(-1, shape[2]))
+        drawn = np.flatnonzero((layers[0] == layers[1]).all(axis=1))
+        self._static = (shape, drawn, layers[0][drawn])
+
+    def apply(self, frame):
+        """Paste the static layer, then draw the per-frame primitives on top, in place."""
+        if self.static_ops:
+            if self._static is None or self._static[0] != frame.shape:
+                self._render_static(frame.shape)
+            _, drawn, values = self._static
+            frame.reshape(-1, frame.shape[2])[drawn] = values
+        for op in self.ops:
+            if op[0] == "rect":
+                cv2.rectangle(frame, *op[1:])
+            elif op[0] == "text":
+                self._paste_text(frame, *op[1:])
+            else:
+                self._paste_banner(frame, op[1:])
+        return frame
+
+    def _paste_banner(self, frame, spec):
+        height, fill, text, org, scale, color, thickness = spec
+        key = (spec, frame.shape[1])
+        strip = self._banners.get(key)
+        if strip is None:
+            strip = np.empty((height, frame.shape[1], frame.shape[2]), dtype=np.uint8)
+            strip[:] = fill
+            cv2.putText(strip, text, org, cv2.FONT_HERSHEY_SIMPLEX, scale, color, thickness)
+            self._banners[key] = strip
+        frame[:height] = strip
@@ -1,13 +1,21 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import os
-from datetime import datetime
+import threading
+import time
+from collections import deque
 
 class FirebaseUploader:
     def __init__(self, config_path="scripts/google-services.json"):
         """Initialize Firebase uploader with config"""
         self.enabled = False
         self.error_shown = False
+        # Keep-alive connection pool: no TCP/TLS handshake per update
+        self.session = requests.Session()
+        # Whether requests need ?auth=; None until one variant has succeeded
+        self.use_auth = None
         
         try:
             if not os.path.exists(config_path):
@@ -21,6 +29,12 @@ class FirebaseUploader:
             self.database_url = config["project_info"]["firebase_url"]
             self.api_key = config["client"][0]["api_key"][0]["current_key"]
             self.device_id = "MEM001"  # Device ID as shown in screenshot
+            # Fields and path that are the same in every status update
+            self.status_base = {"model": "MOMENTO Demo Device", "serial": "MEM001"}
+            self.status_path = f"devices/{self.device_id}.json"
+            self.session.mount(self.database_url, HTTPAdapter(
+                pool_connections=2, pool_maxsize=4,
+                max_retries=Retry(total=2, backoff_factor=0.2)))
             self.enabled = True
             
             print(f"✅ Firebase initialized: {self.database_url}")
@@ -30,6 +44,24 @@ class FirebaseUploader:
             print(f"⚠️ Firebase initialization failed: {e}")
             print("   Firebase integration disabled.")
         
+    def _send(self, method, path, data):
+        """
+        Send a request, trying without auth first and then with ?auth=.
+        The variant that succeeds is remembered, so steady state is one
+        round-trip per call.
+        """
+        url = f"{self.database_url}/{path}"
+        modes = (self.use_auth,) if self.use_auth is not None else (False, True)
+        for use_auth in modes:
+            params = {"auth": self.api_key} if use_auth else None
+            response = self.session.request(method, url, json=data, params=params, timeout=5)
+            if response.status_code == 200:
+                self.use_auth = use_auth
+                return response
+        if response.status_code in (401, 403):
+            self.use_auth = None  # Rules changed: probe both variants again
+        return response
+
     def update_status(self, status, status_data=None):
         """
         Update device status in Firebase Realtime Database
@@ -45,40 +77,28 @@ class FirebaseUploader:
         
         # Prepare data
         data = {
+            **self.status_base,
             "status": status,
-            "lastUpdate": int(datetime.now().timestamp() * 1000),  # milliseconds
-            "model": "MOMENTO Demo Device",
-            "serial": "MEM001"
+            "lastUpdate": int(time.time() * 1000),  # milliseconds
         }
         
         # Add additional status data if provided
         if status_data:
             data.update(status_data)
         
-        # Firebase REST API endpoint (try without auth first)
-        url = f"{self.database_url}/devices/{self.device_id}.json"
-        
         try:
-            response = requests.patch(url, json=data, timeout=5)
+            response = self._send("patch", self.status_path, data)
             if response.status_code == 200:
                 if not self.error_shown:
                     print(f"✅ Firebase: Status updated to '{status}'")
                 return True
             else:
-                # Try with auth if no-auth failed
-                url_with_auth = f"{self.database_url}/devices/{self.device_id}.json?auth={self.api_key}"
-                response = requests.patch(url_with_auth, json=data, timeout=5)
-                if response.status_code == 200:
-                    if not self.error_shown:
-                        print(f"✅ Firebase: Status updated to '{status}'")
-                    return True
-                else:
-                    if not self.error_shown:
-                        print(f"❌ Firebase update failed: {response.status_code}")
-                        print(f"   Response: {response.text}")
-                        print(f"   Run 'python test_firebase.py' to diagnose")
-                        self.error_shown = True
-                    return False
+                if not self.error_shown:
+                    print(f"❌ Firebase update failed: {response.status_code}")
+                    print(f"   Response: {response.text}")
+                    print(f"   Run 'python test_firebase.py' to diagnose")
+                    self.error_shown = True
+                return False
         except requests.exceptions.Timeout:
             if not self.error_shown:
                 print(f"❌ Firebase timeout - check network connection")
@@ -109,29 +129,107 @@ class FirebaseUploader:
             "deviceId": self.device_id
         }
         
-        # Send to alerts node (try without auth first)
-        url = f"{self.database_url}/alerts.json"
-        
         try:
-            response = requests.post(url, json=alert_data, timeout=5)
+            response = self._send("post", "alerts.json", alert_data)
             if response.status_code == 200:
                 print(f"✅ Firebase Alert: Child {child_id} - {alert_type}")
                 return True
             else:
-                # Try with auth
-                url_with_auth = f"{self.database_url}/alerts.json?auth={self.api_key}"
-                response = requests.post(url_with_auth, json=alert_data, timeout=5)
-                if response.status_code == 200:
-                    print(f"✅ Firebase Alert: Child {child_id} - {alert_type}")
-                    return True
-                else:
-                    if not self.error_shown:
-                        print(f"❌ Firebase alert failed: {response.status_code}")
-                        print(f"   Response: {response.text}")
-                        self.error_shown = True
-                    return False
+                if not self.error_shown:
+                    print(f"❌ Firebase alert failed: {response.status_code}")
+                    print(f"   Response: {response.text}")
+                    self.error_shown = True
+                return False
         except Exception as e:
             if not self.error_shown:
                 print(f"❌ Firebase alert error: {e}")
                 self.error_shown = True
             return False
+
+
+class AsyncUploader:
+    """
+    Runs FirebaseUploader calls on a background thread so network latency
+    never stalls the frame loop. Status updates are coalesced (only the
+    newest pending one is sent, at most one PATCH per min_interval seconds);
+    a status identical to the last one sent is only repeated every
+    heartbeat seconds. Alerts are all delivered immediately, in order.
+    """
+
+    def __init__(self, uploader, min_interval=0.5, heartbeat=10.0):
+        self.uploader = uploader
+        self.enabled = uploader.enabled
+        self.min_interval = min_interval
+        self.heartbeat = heartbeat
+        self.cond = threading.Condition()
+        self.pending_status = None
+        self.alerts = deque()
+        self.stopped = False
+        self.thread = None
+        if self.enabled:
+            self.thread = threading.Thread(target=self._worker, daemon=True)
+            self.thread.start()
+
+    def update_status(self, status, status_data=None):
+        """Queue a status update, replacing one that has not been sent yet."""
+        if not self.enabled:
+            return False
+        with self.cond:
+            self.pending_status = (status, status_data)
+            self.cond.notify()
+        return True
+
+    def send_alert(self, child_id, alert_type, timestamp):
+        """Queue a danger zone alert."""
+        if not self.enabled:
+            return False
+        with self.cond:
+            self.alerts.append((child_id, alert_type, timestamp))
+            self.cond.notify()
+        return True
+
+    def close(self, timeout=5):
+        """Send whatever is still queued, then stop the worker."""
+        if self.thread is None:
+            return
+        with self.cond:
+            self.stopped = True
+            self.cond.notify()
+        self.thread.join(timeout)
+
+    def _worker(self):
+        next_status_at = 0.0
+        last_sent = None  # (status, data without its timestamp)
+        last_sent_at = 0.0
+        while True:
+            with self.cond:
+                # Wake for alerts at once, for a status once the interval is up
+                while not self.alerts and not self.stopped:
+                    if self.pending_status is None:
+                        self.cond.wait()
+                        continue
+                    delay = next_status_at - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self.cond.wait(delay)
+                alerts = list(self.alerts)
+                self.alerts.clear()
+                status = None
+                if self.pending_status is not None and (
+                        self.stopped or time.monotonic() >= next_status_at):
+                    status, self.pending_status = self.pending_status, None
+                done = self.stopped and self.pending_status is None
+
+            # Alerts first: they are time-critical, statuses are periodic
+            for alert in alerts:
+                self.uploader.send_alert(*alert)
+            if status is not None:
+                name, data = status
+                content = (name, {k: v for k, v in (data or {}).items() if k != "timestamp"})
+                now = time.monotonic()
+                if content != last_sent or now - last_sent_at >= self.heartbeat:
+                    self.uploader.update_status(name, data)
+                    last_sent, last_sent_at = content, now
+                next_status_at = time.monotonic() + self.min_interval
+            if done:
+                return